@@ -0,0 +1,204 @@
+"""
+Build the self-hosted stylesheet and fonts for the AstroDISC™ Lite index page.
+
+Replaces the three CDN dependencies of BASE_HTML (the in-browser Tailwind JIT, the full
+Font Awesome stylesheet and Google Fonts) with one purged, minified stylesheet and a few
+subset fonts. Every output file carries a content hash in its name and is listed in
+static/dist/manifest.json, which main.py reads at startup to serve them from /assets/.
+
+Usage:
+    pip install fonttools brotli
+    python build_assets.py
+
+Needs network access and Node.js (the Tailwind CLI runs through npx; set TAILWIND_CLI to
+use a standalone binary instead). FONT_AWESOME_URL and INTER_CSS_URL override the font sources.
+"""
+import ast
+import hashlib
+import io
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import tempfile
+import urllib.request
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(ROOT, 'static', 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+TAILWIND_CLI = os.getenv('TAILWIND_CLI', 'npx --yes tailwindcss@3.4.17')
+# Sources can point at a mirror or local copy (file:// URLs work) for builds without CDN access
+FONT_AWESOME_URL = os.getenv('FONT_AWESOME_URL', 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0')
+INTER_CSS_URL = os.getenv(
+    'INTER_CSS_URL', 'https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap'
+)
+INTER_SUBSETS = ('latin', 'latin-ext')  # unicode-range blocks worth shipping
+INTER_PRELOAD = ('latin', '400')        # (subset, weight) preloaded by the page: body text
+# Google Fonts only serves woff2 to browsers it recognizes
+BROWSER_UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36'
+
+# Font Awesome classes that are modifiers rather than icons
+FA_MODIFIERS = {'fa-spin', 'fa-pulse', 'fa-fw', 'fa-lg', 'fa-xs', 'fa-sm', 'fa-2x', 'fa-3x'}
+
+_CLASS_ATTR_RE = re.compile(r'class="([^"]*)"')
+_CLASS_JS_RE = re.compile(r"(?:className\s*=|classList\.(?:add|remove|toggle)\()([^;\n]*)")
+_CLASS_TOKEN_RE = re.compile(r"^[a-z0-9][a-z0-9:/._%\[\]-]*$")
+_FA_RULE_RE = re.compile(r'((?:\.fa-[a-z0-9-]+::?before\s*,?\s*)+)\{\s*content:\s*"\\([0-9a-f]+)"')
+_FONT_FACE_RE = re.compile(r'/\*\s*([a-z-]+)\s*\*/\s*(@font-face\s*\{[^}]*\})')
+_URL_RE = re.compile(r'url\(([^)]+)\)')
+_FONT_WEIGHT_RE = re.compile(r'font-weight:\s*(\d+)')
+
+
+def read_base_html() -> str:
+    """Return BASE_HTML from main.py without importing it (importing starts model discovery)."""
+    with open(os.path.join(ROOT, 'main.py'), encoding='utf-8') as fh:
+        tree = ast.parse(fh.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'BASE_HTML' for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise SystemExit('BASE_HTML not found in main.py')
+
+
+def extract_classes(page: str) -> set:
+    """Every class name used in the page: class="..." attributes plus classes set from JavaScript."""
+    tokens = {token for chunk in _CLASS_ATTR_RE.findall(page) for token in chunk.split()}
+    # JS assignments may build class strings from several literals ('a b' + cond ? 'c' : 'd');
+    # stray identifiers picked up here generate no CSS
+    for fragment in _CLASS_JS_RE.findall(page):
+        tokens.update(re.split(r"[^a-z0-9:/._%\[\]-]+", fragment))
+    return {token for token in tokens if _CLASS_TOKEN_RE.match(token)}
+
+
+def fetch(url: str) -> bytes:
+    request = urllib.request.Request(url, headers={'User-Agent': BROWSER_UA})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.read()
+
+
+def minify_css(css: str) -> str:
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def fingerprint(name: str, data: bytes) -> str:
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+
+
+def build_tailwind(classes: set) -> str:
+    """Run the Tailwind CLI over the extracted class list only, so nothing unused survives."""
+    with tempfile.TemporaryDirectory() as tmp:
+        content = os.path.join(tmp, 'classes.html')
+        source = os.path.join(tmp, 'input.css')
+        output = os.path.join(tmp, 'output.css')
+        with open(content, 'w', encoding='utf-8') as fh:
+            fh.write(f'<div class="{" ".join(sorted(classes))}"></div>\n')
+        with open(source, 'w', encoding='utf-8') as fh:
+            fh.write('@tailwind base;\n@tailwind components;\n@tailwind utilities;\n')
+        command = shlex.split(TAILWIND_CLI) + ['-i', source, '-o', output, '--content', content, '--minify']
+        subprocess.run(command, check=True)
+        with open(output, encoding='utf-8') as fh:
+            return fh.read()
+
+
+def build_icons(classes: set, files: dict) -> str:
+    """Subset the Font Awesome solid font to the icons used and emit CSS for just those icons."""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    codepoints = {}
+    for selectors, codepoint in _FA_RULE_RE.findall(fetch(f'{FONT_AWESOME_URL}/css/all.css').decode('utf-8')):
+        for name in re.findall(r'\.(fa-[a-z0-9-]+)', selectors):
+            codepoints[name] = codepoint
+
+    icons = sorted(c for c in classes if c.startswith('fa-') and c not in FA_MODIFIERS)
+    missing = [icon for icon in icons if icon not in codepoints]
+    if missing:
+        print(f"⚠️  Not in Font Awesome Free, left blank: {', '.join(missing)}")
+    icons = [icon for icon in icons if icon in codepoints]
+
+    font = TTFont(io.BytesIO(fetch(f'{FONT_AWESOME_URL}/webfonts/fa-solid-900.woff2')))
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = []
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes={int(codepoints[icon], 16) for icon in icons})
+    subsetter.subset(font)
+    out = io.BytesIO()
+    font.flavor = 'woff2'
+    font.save(out)
+    font_name = fingerprint('fa-solid-900.woff2', out.getvalue())
+    files[font_name] = out.getvalue()
+
+    css = [
+        '@font-face{font-family:"Font Awesome 6 Free";font-style:normal;font-weight:900;font-display:block;'
+        f'src:url({font_name}) format("woff2")}}',
+        '.fa,.fas,.fa-solid{-moz-osx-font-smoothing:grayscale;-webkit-font-smoothing:antialiased;'
+        'display:var(--fa-display,inline-block);font-style:normal;font-variant:normal;line-height:1;'
+        'text-rendering:auto;font-family:"Font Awesome 6 Free";font-weight:900}',
+    ]
+    if 'fa-spin' in classes:
+        css.append('.fa-spin{animation:fa-spin 2s linear infinite}'
+                   '@keyframes fa-spin{0%{transform:rotate(0)}to{transform:rotate(1turn)}}')
+    css.extend(f'.{icon}:before{{content:"\\{codepoints[icon]}"}}' for icon in icons)
+    print(f"🔣 {len(icons)} icons, font subset to {len(out.getvalue()):,} bytes")
+    return ''.join(css)
+
+
+def build_inter(files: dict, preload: list) -> str:
+    """Download the Inter subsets worth shipping and return @font-face rules pointing at local copies."""
+    css = fetch(INTER_CSS_URL).decode('utf-8')
+    rules = []
+    local_names = {}
+    for subset_name, rule in _FONT_FACE_RE.findall(css):
+        if subset_name not in INTER_SUBSETS:
+            continue
+        url = _URL_RE.search(rule).group(1).strip('\'"')
+        if url not in local_names:
+            data = fetch(url)
+            local_names[url] = fingerprint(f'inter-{subset_name}.woff2', data)
+            files[local_names[url]] = data
+        weight = _FONT_WEIGHT_RE.search(rule)
+        if (subset_name, weight and weight.group(1)) == INTER_PRELOAD and local_names[url] not in preload:
+            preload.append(local_names[url])
+        rules.append(rule.replace(url, local_names[url]))
+    return minify_css('\n'.join(rules))
+
+
+def main() -> None:
+    page = read_base_html()
+    classes = extract_classes(page)
+    print(f"🔎 {len(classes)} classes used in BASE_HTML")
+
+    files, preload = {}, []
+    css = build_inter(files, preload) + build_icons(classes, files) + build_tailwind(classes)
+    css_name = fingerprint('app.css', css.encode('utf-8'))
+    files[css_name] = css.encode('utf-8')
+
+    os.makedirs(DIST_DIR, exist_ok=True)
+    for name in os.listdir(DIST_DIR):
+        if name not in files and name != 'manifest.json':
+            os.remove(os.path.join(DIST_DIR, name))  # superseded fingerprints
+    for name, data in files.items():
+        with open(os.path.join(DIST_DIR, name), 'wb') as fh:
+            fh.write(data)
+    manifest = {'css': css_name, 'preload': preload, 'files': sorted(files)}
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2)
+
+    for name in sorted(files):
+        print(f"📦 static/dist/{name} ({len(files[name]):,} bytes)")
+    print(f"✅ Wrote {os.path.relpath(MANIFEST_PATH, ROOT)}; restart the app to serve the new assets")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"❌ Asset build failed: {e}")
+        sys.exit(1)
@@ -1,196 +1,2661 @@
 
 
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, Response, abort, request, jsonify, send_from_directory, stream_with_context
+from werkzeug.http import parse_accept_header, parse_etags
 import argparse
+import atexit
+import csv
+import gzip
+import io
+import math
 import os
 import textwrap
 import html
+import threading
+import time
+import asyncio
+import hashlib
+import random
+import re
+import sqlite3
+import queue
+from dataclasses import dataclass
+from email.utils import formatdate
+from functools import lru_cache
+from collections import OrderedDict, deque
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError as FutureTimeoutError, wait as wait_futures
 import google.generativeai as genai
 from dotenv import load_dotenv
 import json
 
+try:
+    import brotli  # optional: adds a pre-compressed br variant of the index page
+except ImportError:
+    brotli = None
+
 load_dotenv()
 
-app = Flask(__name__)
+app = Flask(__name__)
+
+# =====================
+# Configuration / Data
+# =====================
+BIRTH_CHART = "Sun in Libra, Ascendant in Capricorn"
+DISC_PROFILE = "High C, low I"
+DEFAULT_PROMPT = (
+    "Synthesize a career recommendation based on a person with a birth chart indicating 'Sun in Libra, "
+    "Ascendant in Capricorn' and a DISC profile of 'High C, low I.' The final output should be a single paragraph "
+    "written in a friendly, conversational tone, suitable for a personalized report. The key themes to explore "
+    "are balancing an innate desire for harmony with a disciplined work ethic, and leveraging a detail-oriented "
+    "nature in a role that values structure."
+)
+
+# Try different model names - updated for current API version
+# The API has changed and these are the current model names
+GEMINI_CANDIDATE_MODELS = [
+    'gemini-1.5-pro-latest',  # Latest stable version
+    'gemini-1.5-pro-002',     # Stable version from September 2024
+    'gemini-1.5-pro',         # Stable version from May 2024
+    'gemini-1.5-flash-latest', # Latest flash version
+    'gemini-1.5-flash-002',   # Stable flash version
+    'gemini-1.5-flash',       # Flash alias
+    'gemini-2.0-flash',       # Newer 2.0 version
+    'gemini-2.0-flash-001'    # Stable 2.0 version
+]
+
+# How long `--cli` waits for background model discovery before using the fallback,
+# and how long /readyz holds back a new instance while discovery is still running
+GEMINI_DISCOVERY_TIMEOUT = float(os.getenv("GEMINI_DISCOVERY_TIMEOUT", "30"))
+# Cap on each `genai.list_models()` call, so a hung listing cannot stall discovery
+GEMINI_LIST_TIMEOUT = float(os.getenv("GEMINI_LIST_TIMEOUT", "10"))
+# Candidates are probed concurrently; anything still pending after this many seconds is abandoned
+GEMINI_PROBE_DEADLINE = float(os.getenv("GEMINI_PROBE_DEADLINE", "15"))
+
+# Circuit breaker settings for the runtime model health registry
+GEMINI_BREAKER_WINDOW = int(os.getenv("GEMINI_BREAKER_WINDOW", "20"))            # calls remembered per model
+GEMINI_BREAKER_MIN_CALLS = int(os.getenv("GEMINI_BREAKER_MIN_CALLS", "4"))       # calls before the error rate counts
+GEMINI_BREAKER_ERROR_RATE = float(os.getenv("GEMINI_BREAKER_ERROR_RATE", "0.5")) # failure ratio that opens the breaker
+GEMINI_BREAKER_SLOW_SECONDS = float(os.getenv("GEMINI_BREAKER_SLOW_SECONDS", "20"))  # slower calls count as failures
+GEMINI_BREAKER_COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30"))     # seconds open before a half-open probe
+
+# In-process cache of generated paragraphs, keyed on normalized (birth chart, DISC) inputs
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "512"))
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", str(60 * 60)))
+# After the soft TTL a cached report is still served, and one background refresh is started
+REPORT_CACHE_SOFT_TTL = float(os.getenv("REPORT_CACHE_SOFT_TTL", str(30 * 60)))
+
+# Longest accepted "birth" or "disc" text. Parsed inputs are memoized, so this also bounds that memory
+MAX_INPUT_CHARS = int(os.getenv("MAX_INPUT_CHARS", "500"))
+
+# /generate/batch: most profiles per request and how many Gemini calls may run at once
+BATCH_MAX_PROFILES = int(os.getenv("BATCH_MAX_PROFILES", "500"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+# Hard cap on generated tokens; streaming also stops as soon as the paragraph is complete.
+# 256 tokens (~1000 characters) is comfortably above the 500-character paragraph limit.
+GEMINI_MAX_OUTPUT_TOKENS = int(os.getenv("GEMINI_MAX_OUTPUT_TOKENS", "256"))
+
+# Identical concurrent requests share one upstream call; followers give up after this many seconds
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_TIMEOUT", "60"))
+
+# Per-route latency budgets in seconds (0 = no budget). When one runs out the fallback is served
+# and the Gemini call keeps running in the background to fill the cache.
+GENERATE_DEADLINE = float(os.getenv("GENERATE_DEADLINE", "10"))
+GENERATE_STREAM_DEADLINE = float(os.getenv("GENERATE_STREAM_DEADLINE", "20"))
+BATCH_DEADLINE = float(os.getenv("BATCH_DEADLINE", "30"))
+# Hard cap on one upstream call, including calls finishing in the background
+GEMINI_CALL_TIMEOUT = float(os.getenv("GEMINI_CALL_TIMEOUT", "60"))
+GEMINI_BACKGROUND_WORKERS = int(os.getenv("GEMINI_BACKGROUND_WORKERS", "32"))
+
+# Outbound Gemini quota (0 disables a budget). Calls that would wait longer than
+# GEMINI_RATE_MAX_WAIT seconds, or find GEMINI_RATE_MAX_QUEUE calls already waiting, use the fallback.
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "60"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "1000000"))
+GEMINI_RATE_MAX_WAIT = float(os.getenv("GEMINI_RATE_MAX_WAIT", "2"))
+GEMINI_RATE_MAX_QUEUE = int(os.getenv("GEMINI_RATE_MAX_QUEUE", "32"))
+
+# Hedged requests: if the primary model is slower than its own p90, send a duplicate to the
+# next healthy model and keep whichever answers first. Capped at this share of requests (0 = off).
+GEMINI_HEDGE_PERCENT = float(os.getenv("GEMINI_HEDGE_PERCENT", "0"))
+GEMINI_HEDGE_MIN_SAMPLES = int(os.getenv("GEMINI_HEDGE_MIN_SAMPLES", "10"))  # successful calls before p90 is trusted
+GEMINI_HEDGE_HOLDOUT = float(os.getenv("GEMINI_HEDGE_HOLDOUT", "5"))  # % of requests never hedged, as the p99 baseline
+
+# Discovery results are persisted here so restarts can skip the probe loop
+GEMINI_MODEL_CACHE_PATH = os.getenv(
+    "GEMINI_MODEL_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".gemini_model_cache.json"),
+)
+GEMINI_MODEL_CACHE_TTL = float(os.getenv("GEMINI_MODEL_CACHE_TTL", str(24 * 60 * 60)))
+# /models serves the model list from memory; older lists are re-fetched in the background
+MODELS_CATALOGUE_TTL = float(os.getenv("MODELS_CATALOGUE_TTL", str(60 * 60)))
+
+# Generated reports persisted across restarts and shared by every worker on the host ('' = off)
+REPORT_STORE_PATH = os.getenv(
+    "REPORT_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_store.sqlite3"),
+)
+REPORT_STORE_TTL = float(os.getenv("REPORT_STORE_TTL", str(7 * 24 * 60 * 60)))
+# Stored reports only match the prompt that produced them; defaults to a hash of the prompt template
+PROMPT_VERSION = os.getenv("PROMPT_VERSION", "")
+
+# Precomputed reports for every Sun x Ascendant x common DISC pattern (built with --build-table)
+REPORT_TABLE_PATH = os.getenv(
+    "REPORT_TABLE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_table.sqlite3"),
+)
+
+# Response compression: bodies smaller than this many bytes are sent as-is; compressed static
+# files are kept in an LRU of this many entries
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "500"))
+COMPRESS_CACHE_SIZE = int(os.getenv("COMPRESS_CACHE_SIZE", "256"))
+
+# Gemini API Configuration
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# The app always starts in fallback mode. Model discovery runs in a background
+# thread and flips these two globals together (under _discovery_lock) once a
+# working model is found, so importing this module never blocks on the network.
+GEMINI_AVAILABLE = False
+GEMINI_MODEL = None
+
+_discovery_lock = threading.Lock()
+_discovery_done = threading.Event()
+_discovery_thread = None
+DISCOVERY_STATUS = {
+    'state': 'idle',  # idle -> running -> ready | failed | disabled
+    'model': None,
+    'error': None,
+    'from_cache': False,
+    'started_at': None,
+    'finished_at': None,
+}
+# Discovery has settled in these states; requests no longer change behaviour mid-flight
+DISCOVERY_SETTLED_STATES = ('ready', 'failed', 'disabled')
+# Per-candidate probe results: {model_name: {'status', 'ok', 'latency', 'error', 'checked_at'}}
+MODEL_PROBES = {}
+# Whether the on-disk cache currently holds an entry for this key (avoids file I/O on every error)
+_model_cache_present = False
+
+if GEMINI_API_KEY:
+    try:
+        genai.configure(api_key=GEMINI_API_KEY)
+    except Exception as e:
+        print(f"⚠️  Gemini API configuration failed: {e}")
+        print(f"💡 Error details: {type(e).__name__}")
+        GEMINI_API_KEY = None
+else:
+    print("⚠️  No GEMINI_API_KEY found in environment variables. Using fallback generator.")
+
+# =====================
+# Gemini model discovery
+# =====================
+# Function to list available models
+def list_available_models():
+    try:
+        models = list(genai.list_models(request_options={'timeout': GEMINI_LIST_TIMEOUT}))
+        print("📋 Available Gemini models:")
+        for model in models:
+            if 'generateContent' in model.supported_generation_methods:
+                print(f"  ✅ {model.name} - Supports generateContent")
+            else:
+                print(f"  ❌ {model.name} - No generateContent support")
+        return models
+    except Exception as e:
+        print(f"⚠️  Could not list models: {e}")
+        return []
+
+# Function to test API connection
+def test_api_connection():
+    try:
+        print("🔍 Testing API connection...")
+        # Try to list models first
+        models = list(genai.list_models(request_options={'timeout': GEMINI_LIST_TIMEOUT}))  # Convert generator to list
+        print(f"✅ API connection successful. Found {len(models)} models.")
+        return True
+    except Exception as e:
+        print(f"❌ API connection failed: {e}")
+        print(f"💡 Error type: {type(e).__name__}")
+        if "404" in str(e):
+            print("💡 404 error suggests model not found or API version mismatch")
+        elif "403" in str(e):
+            print("💡 403 error suggests API key permission issues")
+        elif "401" in str(e):
+            print("💡 401 error suggests invalid API key")
+        return False
+
+def _describe_model(model) -> dict:
+    """JSON-friendly summary of a `genai.list_models()` entry."""
+    return {
+        'name': model.name,
+        'display_name': getattr(model, 'display_name', None),
+        'description': getattr(model, 'description', None),
+        'supported_generation_methods': list(model.supported_generation_methods),
+    }
+
+def _probe_model(model_name: str):
+    """Send a trivial prompt to one candidate. Records the outcome in MODEL_PROBES."""
+    started = time.perf_counter()
+    try:
+        print(f"🔍 Testing model: {model_name}")
+        model = genai.GenerativeModel(model_name)
+        # Test the model with a simple prompt
+        response = model.generate_content("Hello")
+        ok = bool(response and response.text)
+        error = None if ok else 'empty response'
+    except Exception as model_error:
+        model, ok, error = None, False, str(model_error)
+    MODEL_PROBES[model_name] = {
+        'status': 'ok' if ok else 'failed',
+        'ok': ok,
+        'latency': round(time.perf_counter() - started, 4),
+        'error': error,
+        'checked_at': time.time(),
+    }
+    if ok:
+        MODEL_REGISTRY.register(model)
+        print(f"✅ Model {model_name} answered in {MODEL_PROBES[model_name]['latency']:.2f}s")
+    elif error == 'empty response':
+        print(f"⚠️  Model {model_name} returned empty response")
+    else:
+        print(f"⚠️  Model {model_name} failed: {error}")
+    return model if ok else None
+
+def probe_candidate_models(candidates=None, deadline=None, on_settled=None):
+    """
+    Probe all candidates concurrently and return the highest-priority model that works, or None.
+
+    A success is accepted as soon as every higher-priority candidate has failed, so cold start
+    is bounded by the fastest good model rather than the sum of all failures. When `deadline`
+    seconds pass, the best success so far wins and the remaining probes are abandoned.
+    Abandoned probes keep running; `on_settled()` is called once the last of them finishes.
+    """
+    candidates = list(candidates or GEMINI_CANDIDATE_MODELS)
+    deadline = GEMINI_PROBE_DEADLINE if deadline is None else deadline
+    give_up_at = time.monotonic() + deadline
+    for name in candidates:
+        MODEL_PROBES.pop(name, None)
+    executor = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix='gemini-probe')
+    futures = [executor.submit(_probe_model, name) for name in candidates]
+    winner = None
+    try:
+        pending = set(futures)
+        while pending:
+            remaining = give_up_at - time.monotonic()
+            if remaining <= 0:
+                break
+            _, pending = wait_futures(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            # Walk in priority order: stop at the first unresolved candidate
+            for future in futures:
+                if not future.done():
+                    break
+                if future.result() is not None:
+                    winner = future.result()
+                    break
+            if winner is not None:
+                break
+        if winner is None:
+            winner = next(
+                (f.result() for f in futures if f.done() and f.result() is not None), None
+            )
+    finally:
+        for name, future in zip(candidates, futures):
+            if not future.done():
+                future.cancel()
+                MODEL_PROBES.setdefault(name, {
+                    'status': 'abandoned', 'ok': False, 'latency': None,
+                    'error': 'probe abandoned after a higher-priority model was selected'
+                    if winner is not None else f'no answer within {deadline:.0f}s',
+                    'checked_at': time.time(),
+                })
+        # Don't wait for in-flight HTTP calls; they finish on their own and update MODEL_PROBES
+        executor.shutdown(wait=False, cancel_futures=True)
+        running = [future for future in futures if not future.done()]
+        if on_settled is not None and running:
+            remaining = [len(running)]
+            remaining_lock = threading.Lock()
+
+            def probe_settled(_future):
+                with remaining_lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    on_settled()
+
+            for future in running:
+                future.add_done_callback(probe_settled)
+    return winner
+
+# =====================
+# Model capability cache (on disk)
+# =====================
+def _api_key_fingerprint(api_key: str) -> str:
+    """Stable, non-reversible identifier for an API key, used as the cache key."""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+def _read_model_cache_file() -> dict:
+    try:
+        with open(GEMINI_MODEL_CACHE_PATH, 'r', encoding='utf-8') as fh:
+            data = json.load(fh)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _write_model_cache_file(data: dict) -> None:
+    # Write-then-rename so concurrently booting workers never read a torn file
+    tmp_path = f"{GEMINI_MODEL_CACHE_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, indent=2)
+        os.replace(tmp_path, GEMINI_MODEL_CACHE_PATH)
+    except OSError as e:
+        print(f"⚠️  Could not write model cache {GEMINI_MODEL_CACHE_PATH}: {e}")
+
+def load_model_cache():
+    """Return the cached discovery entry for the current API key, or None if missing/expired."""
+    if not GEMINI_API_KEY or GEMINI_MODEL_CACHE_TTL <= 0:
+        return None
+    entry = _read_model_cache_file().get(_api_key_fingerprint(GEMINI_API_KEY))
+    if not entry or not entry.get('selected'):
+        return None
+    if time.time() - entry.get('saved_at', 0) > GEMINI_MODEL_CACHE_TTL:
+        return None
+    global _model_cache_present
+    _model_cache_present = True
+    return entry
+
+def save_model_cache(selected, models, saved_at=None) -> None:
+    """
+    Persist the model list, probe results and selected model for the current API key.
+    `saved_at` keeps an existing entry's age when only its probe results are being updated.
+    """
+    global _model_cache_present
+    if not GEMINI_API_KEY:
+        return
+    data = _read_model_cache_file()
+    data[_api_key_fingerprint(GEMINI_API_KEY)] = {
+        'saved_at': time.time() if saved_at is None else saved_at,
+        'selected': selected,
+        'models': [m if isinstance(m, dict) else _describe_model(m) for m in models],
+        'probes': dict(MODEL_PROBES),
+    }
+    _write_model_cache_file(data)
+    _model_cache_present = True
+
+def invalidate_model_cache() -> None:
+    """Drop the cached entry for the current API key so the next start re-discovers."""
+    global _model_cache_present
+    if not GEMINI_API_KEY or not _model_cache_present:
+        return
+    _model_cache_present = False
+    data = _read_model_cache_file()
+    if data.pop(_api_key_fingerprint(GEMINI_API_KEY), None) is not None:
+        _write_model_cache_file(data)
+        print("🗑️  Invalidated cached Gemini model selection")
+
+# =====================
+# Model catalogue
+# =====================
+class ModelCatalogue:
+    """
+    The account's model list, shared by discovery and /models.
+
+    Discovery (or the on-disk model cache) fills it at startup. Reads never touch the network once it
+    is filled: an entry older than `ttl` is still served while one background thread re-lists the models.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._models = None
+        self._fetched_at = None
+        self._refreshing = False
+        self.refreshes = 0
+        self.errors = 0
+        self.last_error = None
+
+    def publish(self, models, fetched_at=None) -> None:
+        """Store a model list: `genai.list_models()` entries or `_describe_model()` dicts."""
+        described = [m if isinstance(m, dict) else _describe_model(m) for m in models]
+        with self._lock:
+            self._models = described
+            self._fetched_at = time.time() if fetched_at is None else fetched_at
+
+    def get(self):
+        """Return (models, fetched_at), or (None, None) before the first listing. Starts a refresh when stale."""
+        with self._lock:
+            models, fetched_at = self._models, self._fetched_at
+            stale = fetched_at is None or time.time() - fetched_at > self.ttl
+            start = stale and models is not None and not self._refreshing
+            if start:
+                self._refreshing = True
+        if start:
+            threading.Thread(target=self._refresh_in_background, name='model-catalogue', daemon=True).start()
+        return models, fetched_at
+
+    def refresh(self) -> bool:
+        """List the models now. Returns False (and keeps the previous list) if the API call fails."""
+        try:
+            models = list(genai.list_models(request_options={'timeout': GEMINI_LIST_TIMEOUT}))
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                self.last_error = str(e)
+            print(f"⚠️  Could not refresh the model catalogue: {e}")
+            return False
+        self.publish(models)
+        with self._lock:
+            self.refreshes += 1
+            self.last_error = None
+        return True
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'models': len(self._models) if self._models is not None else None,
+                'fetched_at': self._fetched_at,
+                'ttl': self.ttl,
+                'refreshing': self._refreshing,
+                'refreshes': self.refreshes,
+                'errors': self.errors,
+                'last_error': self.last_error,
+            }
+
+MODEL_CATALOGUE = ModelCatalogue(MODELS_CATALOGUE_TTL)
+
+# =====================
+# Model health registry
+# =====================
+def _percentile(values, q: float):
+    """Nearest-rank percentile: the smallest value with at least q of the samples at or below it."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+def _short_model_name(name: str) -> str:
+    return name.split('/')[-1]
+
+class ModelBreaker:
+    """
+    Circuit breaker for one Gemini model.
+
+    closed    -> calls flow; errors and slow calls are tracked over a rolling window
+    open      -> the model is skipped until GEMINI_BREAKER_COOLDOWN has passed
+    half_open -> a single trial call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.name = _short_model_name(model.model_name)
+        self.state = 'closed'
+        self.opened_at = None
+        self.calls = deque(maxlen=GEMINI_BREAKER_WINDOW)  # (ok, latency) pairs
+        self.last_error = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may be sent to this model right now."""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                if time.monotonic() - self.opened_at < GEMINI_BREAKER_COOLDOWN:
+                    return False
+                self.state = 'half_open'
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self, latency: float) -> None:
+        if latency > GEMINI_BREAKER_SLOW_SECONDS:
+            self.record_failure(latency, f'slow call ({latency:.1f}s)')
+            return
+        with self._lock:
+            if self.state == 'half_open':
+                print(f"✅ Gemini model {self.name} recovered, closing breaker")
+                self.state = 'closed'
+                self.calls.clear()
+                self._trial_in_flight = False
+            self.calls.append((True, latency))
+
+    def record_failure(self, latency: float, error) -> None:
+        with self._lock:
+            self.calls.append((False, latency))
+            self.last_error = str(error)
+            if self.state == 'half_open':
+                self._open()
+                return
+            failures = sum(1 for ok, _ in self.calls if not ok)
+            if (self.state == 'closed' and len(self.calls) >= GEMINI_BREAKER_MIN_CALLS
+                    and failures / len(self.calls) >= GEMINI_BREAKER_ERROR_RATE):
+                self._open()
+
+    def release(self) -> None:
+        """Hand back an admitted call that was never made (e.g. refused by the rate limiter)."""
+        with self._lock:
+            if self.state == 'half_open':
+                self._trial_in_flight = False
+
+    def latency_percentile(self, q: float, min_samples: int):
+        """Latency at quantile q over recent successful calls, or None with too few samples."""
+        with self._lock:
+            latencies = [latency for ok, latency in self.calls if ok]
+        if len(latencies) < max(1, min_samples):
+            return None
+        return _percentile(latencies, q)
+
+    def _open(self) -> None:
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+        print(f"🔌 Gemini model {self.name} breaker opened: {self.last_error}")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = list(self.calls)
+            state, last_error = self.state, self.last_error
+        latencies = [latency for _, latency in calls]
+        return {
+            'state': state,
+            'calls': len(calls),
+            'error_rate': round(sum(1 for ok, _ in calls if not ok) / len(calls), 3) if calls else 0.0,
+            'avg_latency': round(sum(latencies) / len(latencies), 4) if latencies else None,
+            'last_error': last_error,
+        }
+
+class ModelRegistry:
+    """All working candidate models, kept in GEMINI_CANDIDATE_MODELS priority order."""
+
+    def __init__(self):
+        self._breakers = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _priority(name: str) -> int:
+        try:
+            return GEMINI_CANDIDATE_MODELS.index(name)
+        except ValueError:
+            return len(GEMINI_CANDIDATE_MODELS)
+
+    def register(self, model) -> None:
+        name = _short_model_name(model.model_name)
+        with self._lock:
+            if any(b.name == name for b in self._breakers):
+                return
+            breakers = self._breakers + [ModelBreaker(model)]
+            breakers.sort(key=lambda b: self._priority(b.name))
+            self._breakers = breakers  # swap, so readers can iterate without the lock
+
+    def healthy(self):
+        """Yield breakers that currently admit a call, highest priority first."""
+        for breaker in self._breakers:
+            if breaker.allow():
+                yield breaker
+
+    def snapshot(self) -> dict:
+        return {b.name: b.snapshot() for b in self._breakers}
+
+    def states(self) -> dict:
+        """Breaker state per model, without the per-call statistics of snapshot()."""
+        return {b.name: b.state for b in self._breakers}
+
+    def __len__(self) -> int:
+        return len(self._breakers)
+
+MODEL_REGISTRY = ModelRegistry()
+
+# =====================
+# Discovery lifecycle
+# =====================
+def _set_active_model(model) -> None:
+    """Atomically switch GEMINI_MODEL / GEMINI_AVAILABLE for all request threads."""
+    global GEMINI_MODEL, GEMINI_AVAILABLE
+    if model is not None:
+        MODEL_REGISTRY.register(model)
+    with _discovery_lock:
+        GEMINI_MODEL = model
+        GEMINI_AVAILABLE = model is not None
+
+def _finish_discovery(state: str, model_name=None, error=None, from_cache=False) -> None:
+    with _discovery_lock:
+        DISCOVERY_STATUS.update(
+            state=state, model=model_name, error=error, from_cache=from_cache, finished_at=time.time()
+        )
+    _discovery_done.set()
+
+def discover_gemini_model() -> bool:
+    """
+    Find a working Gemini model and activate it.
+    Runs on the discovery thread; requests are served by the fallback generator meanwhile.
+    """
+    try:
+        # A model that worked recently for this API key needs no network round trips
+        cached = load_model_cache()
+        if cached:
+            MODEL_PROBES.update(cached.get('probes', {}))
+            # Every model that probed fine last time joins the registry as a failover target
+            for name, probe in cached.get('probes', {}).items():
+                if probe.get('ok'):
+                    MODEL_REGISTRY.register(genai.GenerativeModel(name))
+            if cached.get('models'):
+                MODEL_CATALOGUE.publish(cached['models'], fetched_at=cached.get('saved_at'))
+            model = genai.GenerativeModel(cached['selected'])
+            _set_active_model(model)
+            print(f"⚡ Using cached Gemini model: {model.model_name}")
+            _finish_discovery('ready', model_name=model.model_name, from_cache=True)
+            # Candidates whose probe never finished last time are failover targets we know nothing about
+            unknown = [name for name in GEMINI_CANDIDATE_MODELS
+                       if cached.get('probes', {}).get(name, {}).get('status') in (None, 'abandoned')]
+            if unknown:
+                print(f"🔍 Probing {len(unknown)} unverified fallback models in the background")
+                probe_candidate_models(unknown)
+                print(f"✅ {len(MODEL_REGISTRY)} Gemini models available for failover")
+                save_model_cache(model.model_name, cached.get('models', []), saved_at=cached.get('saved_at'))
+            return True
+
+        # Test API connection first
+        if not test_api_connection():
+            print("❌ Cannot proceed with model testing due to API connection issues")
+            _finish_discovery('failed', error='API connection failed')
+            return False
+
+        # List available models first
+        models = list_available_models()
+        if models:
+            MODEL_CATALOGUE.publish(models)
+
+        model = probe_candidate_models(
+            # Probes still running when the winner was picked are saved once they finish,
+            # so a cached restart knows every failover target
+            on_settled=lambda: GEMINI_MODEL is not None and save_model_cache(GEMINI_MODEL.model_name, models)
+        )
+        if model is None:
+            print("❌ No working Gemini model found")
+            print("💡 This might be due to:")
+            print("   - API key permissions")
+            print("   - Model availability in your region")
+            print("   - API version compatibility")
+            _finish_discovery('failed', error='No working Gemini model found')
+            return False
+
+        _set_active_model(model)
+        print(f"✅ Gemini API configured successfully with model: {model.model_name}")
+        print(f"🎯 Using Gemini model: {model.model_name}")
+        save_model_cache(model.model_name, models)
+        _finish_discovery('ready', model_name=model.model_name)
+        return True
+    except Exception as e:
+        print(f"⚠️  Gemini API configuration failed: {e}")
+        print(f"💡 Error details: {type(e).__name__}")
+        _finish_discovery('failed', error=str(e))
+        return False
+
+def start_model_discovery():
+    """Start background model discovery once per process. Returns the discovery thread, if any."""
+    global _discovery_thread
+    with _discovery_lock:
+        if _discovery_thread is not None or DISCOVERY_STATUS['state'] == 'disabled':
+            return _discovery_thread
+        if not GEMINI_API_KEY:
+            DISCOVERY_STATUS.update(state='disabled', finished_at=time.time())
+            _discovery_done.set()
+            return None
+        DISCOVERY_STATUS.update(state='running', started_at=time.time())
+        _discovery_thread = threading.Thread(
+            target=discover_gemini_model, name='gemini-discovery', daemon=True
+        )
+        _discovery_thread.start()
+        return _discovery_thread
+
+def wait_for_discovery(timeout=None) -> bool:
+    """Block until discovery has finished (or timed out). Returns True if discovery is done."""
+    start_model_discovery()
+    return _discovery_done.wait(timeout)
+
+def discovery_status() -> dict:
+    """Snapshot of the discovery state for readiness reporting."""
+    with _discovery_lock:
+        status = dict(DISCOVERY_STATUS)
+    status['ready'] = status['state'] in DISCOVERY_SETTLED_STATES
+    status['probes'] = {name: dict(probe) for name, probe in list(MODEL_PROBES.items())}
+    return status
+
+# =====================
+# Input parsing: birth chart
+# =====================
+ZODIAC_SIGNS = (
+    'Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
+    'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces',
+)
+CHART_BODIES = (
+    'Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter',
+    'Saturn', 'Uranus', 'Neptune', 'Pluto', 'Ascendant',
+)
+_BODY_ALIASES = {body.lower(): body for body in CHART_BODIES}
+_BODY_ALIASES.update({'rising': 'Ascendant', 'asc': 'Ascendant'})
+_SIGN_LOOKUP = {sign.lower(): sign for sign in ZODIAC_SIGNS}
+# Words that may appear between a body and its sign without changing the meaning
+_CHART_FILLER = frozenset(('in', 'sign', 'signs', 'is', 'the', 'my', 'with', 'placement', 'placements'))
+
+# One precompiled alternation; a single finditer pass classifies every token.
+_CHART_TOKEN_RE = re.compile(
+    r"(?P<body>\b(?:" + '|'.join(sorted(_BODY_ALIASES, key=len, reverse=True)) + r")\b)"
+    r"|(?P<sign>\b(?:" + '|'.join(_SIGN_LOOKUP) + r")\b)"
+    r"|(?P<sep>[,;/\n]|\band\b)"
+    r"|(?P<word>\w+)"
+)
+
+@dataclass(frozen=True)
+class BirthChart:
+    """Parsed birth chart: (body, sign) placements in canonical body order."""
+    placements: tuple
+    complete: bool  # False when the input had words the parser did not understand
+
+    @property
+    def sun(self):
+        return dict(self.placements).get('Sun')
+
+    @property
+    def ascendant(self):
+        return dict(self.placements).get('Ascendant')
+
+    def as_dict(self) -> dict:
+        return dict(self.placements)
+
+    @property
+    def canonical(self) -> str:
+        """Stable spelling, e.g. 'Sun in Libra, Ascendant in Capricorn'."""
+        return ', '.join(f"{body} in {sign}" for body, sign in self.placements)
+
+@lru_cache(maxsize=4096)
+def parse_birth_chart(text: str) -> BirthChart:
+    """
+    Parse free-text chart input such as 'Sun in Libra, Ascendant in Capricorn',
+    'Libra Sun, Capricorn Rising' or 'Sun: Libra, Rising: Capricorn'.
+
+    A body and a sign pair up in either order within one comma/semicolon-separated
+    segment; the first placement seen for a body wins. Two different signs (or bodies)
+    before a pair is formed, as in 'Libra Aries Sun', are ambiguous: that placement is
+    dropped and the chart is incomplete. Results are memoized, so repeated inputs (the
+    common case) cost a dictionary lookup; routes cap input length at MAX_INPUT_CHARS.
+    """
+    found = {}
+    complete = True
+    body = sign = None
+    ambiguous = False
+    for match in _CHART_TOKEN_RE.finditer(text.lower()):
+        kind = match.lastgroup
+        if kind == 'body':
+            name = _BODY_ALIASES[match.group()]
+            ambiguous = ambiguous or (body is not None and body != name)
+            body = name
+        elif kind == 'sign':
+            name = _SIGN_LOOKUP[match.group()]
+            ambiguous = ambiguous or (sign is not None and sign != name)
+            sign = name
+        elif kind == 'sep':
+            if body or sign:
+                complete = False  # dangling half of a placement
+            body = sign = None
+            ambiguous = False
+            continue
+        elif match.group() not in _CHART_FILLER:
+            complete = False
+        if body and sign:
+            if ambiguous:
+                complete = False  # no way to tell which of the names was meant
+            elif found.setdefault(body, sign) != sign:
+                complete = False  # conflicting placements for one body
+            body = sign = None
+            ambiguous = False
+    if body or sign:
+        complete = False
+    placements = tuple((b, found[b]) for b in CHART_BODIES if b in found)
+    return BirthChart(placements=placements, complete=complete and bool(placements))
+
+# =====================
+# Input parsing: DISC profile
+# =====================
+DISC_DIMENSIONS = ('D', 'I', 'S', 'C')
+DISC_LEVELS = ('Unknown', 'Low', 'Medium', 'High')  # index == stored level value
+_DISC_DIMENSION_ALIASES = {
+    'd': 0, 'dominance': 0, 'dominant': 0,
+    'i': 1, 'influence': 1, 'influencing': 1, 'influential': 1,
+    's': 2, 'steadiness': 2, 'steady': 2, 'stability': 2,
+    'c': 3, 'conscientiousness': 3, 'conscientious': 3, 'compliance': 3,
+}
+_DISC_LEVEL_ALIASES = {
+    'low': 1, 'weak': 1, 'minimal': 1,
+    'medium': 2, 'moderate': 2, 'mid': 2, 'balanced': 2, 'average': 2,
+    'high': 3, 'strong': 3,
+}
+# Intensifiers ('very low D') carry no level of their own, so they are skipped like filler
+_DISC_FILLER = frozenset(('disc', 'score', 'scores', 'profile', 'style', 'type', 'in', 'on', 'and', 'is',
+                          'very', 'quite', 'extremely'))
+# Numeric scores (e.g. 'D: 15' or 'D15-I8-S12-C20') on the usual 0-28 DISC scale
+_DISC_SCORE_LEVELS = ((10, 1), (15, 2))  # below 10 -> Low, below 15 -> Medium, else High
+_DISC_TOKEN_RE = re.compile(r"[a-z]+|\d+(?:\.\d+)?|[,;/\n-]")
+
+def _level_from_score(score: float) -> int:
+    for upper_bound, level in _DISC_SCORE_LEVELS:
+        if score < upper_bound:
+            return level
+    return 3
+
+class DiscProfile:
+    """
+    Fixed 4-slot D/I/S/C level vector backed by 4 immutable bytes.
+
+    Levels are 0 (not given), 1 (Low), 2 (Medium) or 3 (High). Profiles compare and
+    hash by value, so they work as cache keys, and `levels` can be stacked straight
+    into a matrix, e.g. numpy.frombuffer(b''.join(p.levels for p in profiles), 'int8').
+    """
+    __slots__ = ('levels', 'unparsed')
+
+    def __init__(self, levels, unparsed=()):
+        self.levels = bytes(levels)
+        self.unparsed = tuple(unparsed)  # input words the parser could not place
+
+    def __getitem__(self, dimension):
+        if isinstance(dimension, str):
+            dimension = DISC_DIMENSIONS.index(dimension.upper())
+        return self.levels[dimension]
+
+    def __iter__(self):
+        return iter(self.levels)
+
+    def __len__(self) -> int:
+        return len(DISC_DIMENSIONS)
+
+    def __eq__(self, other):
+        return isinstance(other, DiscProfile) and self.levels == other.levels
+
+    def __hash__(self):
+        return hash(self.levels)
+
+    def __repr__(self):
+        return f"DiscProfile({self.canonical!r})"
+
+    @property
+    def empty(self) -> bool:
+        return not any(self.levels)
+
+    @property
+    def complete(self) -> bool:
+        """True when at least one dimension was understood and nothing was left over."""
+        return not self.empty and not self.unparsed
+
+    @property
+    def canonical(self) -> str:
+        """Stable spelling in D/I/S/C order, e.g. 'Low I, High C'."""
+        return ', '.join(
+            f"{DISC_LEVELS[level]} {dim}" for dim, level in zip(DISC_DIMENSIONS, self.levels) if level
+        )
+
+    def distance(self, other) -> int:
+        """L1 distance over the dimensions both profiles specify."""
+        return sum(abs(a - b) for a, b in zip(self.levels, other.levels) if a and b)
+
+@lru_cache(maxsize=4096)
+def parse_disc_profile(text: str) -> DiscProfile:
+    """
+    Parse DISC input such as 'High C, low I', 'C: High, D: Medium, I: Low, S: Low',
+    'Conscientiousness: High, Influence: Low' or 'D15-I8-S12-C20'.
+
+    A dimension pairs with a level word or a numeric score in either order; when both
+    are given ('High D (15)') the word wins. Later mentions of a dimension override earlier ones.
+    """
+    levels = [0, 0, 0, 0]
+    unparsed = []
+    dim = level = None
+    last_dim = None  # dimension just assigned, so a trailing score can be absorbed
+    for token in _DISC_TOKEN_RE.findall(text.lower()):
+        if token == '-' and (dim is not None or level is not None):
+            continue  # 'high-C': a hyphen inside a pair joins it, between pairs ('D15-I8') separates
+        if token in ',;/\n-':
+            if dim is not None or level is not None:
+                unparsed.append(token)
+            dim = level = last_dim = None
+            continue
+        if token[0].isdigit():
+            if dim is None and last_dim is not None:
+                continue  # 'High D (15)': the explicit level already won
+            level = _level_from_score(float(token)) if level is None else level
+        elif token in _DISC_DIMENSION_ALIASES:
+            if dim is not None:
+                unparsed.append(token)
+            dim = _DISC_DIMENSION_ALIASES[token]
+        elif token in _DISC_LEVEL_ALIASES:
+            level = _DISC_LEVEL_ALIASES[token]
+        elif token not in _DISC_FILLER:
+            unparsed.append(token)
+            continue
+        if dim is not None and level is not None:
+            levels[dim] = level
+            last_dim, dim, level = dim, None, None
+    if dim is not None or level is not None:
+        unparsed.append('(incomplete)')
+    return DiscProfile(levels, unparsed)
+
+# =====================
+# Utility: Fallback generator
+# =====================
+# Sentence fragments indexed by sign and DISC dimension. They are compiled into flat lookup
+# tables below, so building a paragraph is a handful of tuple/dict lookups and one join.
+_SUN_VALUES = {
+    'Aries': "you're driven by initiative, courage, and the thrill of starting something new",
+    'Taurus': "you value stability, tangible results, and steady progress",
+    'Gemini': "you thrive on curiosity, communication, and variety",
+    'Cancer': "you lead with care, loyalty, and a strong instinct to look after your people",
+    'Leo': "you shine through confidence, creativity, and generous leadership",
+    'Virgo': "you naturally value precision, usefulness, and continuous improvement",
+    'Libra': "you naturally value fairness, relationships, and balance",
+    'Scorpio': "you bring intensity, focus, and a talent for getting to the bottom of things",
+    'Sagittarius': "you're energized by big ideas, learning, and room to explore",
+    'Capricorn': "you value ambition, responsibility, and long-term achievement",
+    'Aquarius': "you're drawn to innovation, independence, and ideas that improve the system",
+    'Pisces': "you bring empathy, imagination, and a deep sense of what others need",
+}
+_SUN_NEEDS = {
+    'Aries': "give you room to lead new initiatives",
+    'Taurus': "reward patience and steady, visible progress",
+    'Gemini': "keep your days varied and full of conversation",
+    'Cancer': "surround you with a close-knit, supportive team",
+    'Leo': "let your work be seen and appreciated",
+    'Virgo': "value getting the details right",
+    'Libra': "allow collaborative harmony",
+    'Scorpio': "let you go deep on meaningful problems",
+    'Sagittarius': "keep you learning and looking ahead",
+    'Capricorn': "lay out a clear path to advancement",
+    'Aquarius': "welcome fresh thinking",
+    'Pisces': "leave space for creativity and compassion",
+}
+_ASCENDANT_STYLE = {
+    'Aries': "a bold, action-first energy",
+    'Taurus': "a calm, dependable presence",
+    'Gemini': "a quick, adaptable, conversational style",
+    'Cancer': "a warm, protective presence",
+    'Leo': "a confident, expressive presence",
+    'Virgo': "a careful, detail-minded style",
+    'Libra': "a gracious, diplomatic style",
+    'Scorpio': "a focused, perceptive intensity",
+    'Sagittarius': "an upbeat, candid, big-picture style",
+    'Capricorn': "a steady, disciplined approach",
+    'Aquarius': "an original, independent style",
+    'Pisces': "a gentle, intuitive presence",
+}
+_DISC_NAMES = ('Dominance', 'Influence', 'Steadiness', 'Conscientiousness')
+_DISC_REWARDS = (
+    "decisiveness, ownership, and visible results",
+    "persuasion, collaboration, and enthusiasm",
+    "consistency, patience, and dependable teamwork",
+    "precision, structure, and deep thinking",
+)
+_DISC_SECONDARY = (
+    "plenty of autonomy",
+    "plenty of people contact",
+    "a stable team around you",
+    "a solid structure to lean on",
+)
+_DISC_DRAINS = (
+    "constant confrontation or high-pressure deal-making",
+    "constant social selling or networking",
+    "repetitive routines with little change",
+    "painstaking detail work under rigid procedures",
+)
+_DISC_CAREERS = (
+    "operations management, entrepreneurship, sales leadership, product ownership, or consulting "
+    "— roles where decisiveness and ownership of results are prized",
+    "marketing, public relations, training, recruiting, or client success "
+    "— roles where energy and people skills are prized",
+    "human resources, healthcare support, customer care, education, or team coordination "
+    "— roles where reliability and patience are prized",
+    "project coordination, compliance, technical writing, data analysis, or quality assurance "
+    "— roles where a methodological mindset and an eye for detail are prized",
+)
+_DISC_OFFERS = (
+    "offer real authority, ambitious targets, and the freedom to make decisions quickly",
+    "offer visible, people-facing work and chances to rally others around a shared goal",
+    "offer a steady team, predictable rhythms, and the chance to support others over the long haul",
+    "offer clear frameworks, measurable goals, and opportunities to work independently on structured "
+    "tasks that showcase your reliability",
+)
+_ELEMENT_CAREERS = {
+    'fire': "entrepreneurship, sales, coaching, or event leadership — roles where energy and initiative are prized",
+    'earth': "finance, operations, engineering, or project management — roles where dependability is prized",
+    'air': "communications, research, design, or consulting — roles where ideas and connection are prized",
+    'water': "counseling, healthcare, the arts, or people operations — roles where empathy is prized",
+}
+_SIGN_ELEMENTS = ('fire', 'earth', 'air', 'water') * 3  # Aries, Taurus, Gemini, Cancer, Leo, ...
+
+_NO_SIGN = len(ZODIAC_SIGNS)  # table slot for "not given"
+_SIGN_SLOT = {sign: i for i, sign in enumerate(ZODIAC_SIGNS)}
+
+def _compile_opening(sun, ascendant) -> str:
+    if sun and ascendant:
+        return (f"With Sun in {sun}, {_SUN_VALUES[sun]}, and with an Ascendant in {ascendant}, "
+                f"you bring {_ASCENDANT_STYLE[ascendant]} to how you present yourself at work.")
+    if sun:
+        return f"With Sun in {sun}, {_SUN_VALUES[sun]}."
+    if ascendant:
+        return (f"With an Ascendant in {ascendant}, you bring {_ASCENDANT_STYLE[ascendant]} "
+                f"to how you present yourself at work.")
+    return ''
+
+def _compile_disc(levels: tuple):
+    """Return (DISC sentence, primary dimension or None) for one level pattern."""
+    highs = [d for d, level in enumerate(levels) if level == 3]
+    lows = [d for d, level in enumerate(levels) if level == 1]
+    mediums = [d for d, level in enumerate(levels) if level == 2]
+    leading = highs or mediums
+    if not leading and not lows:
+        return '', None
+
+    described = [f"high {_DISC_NAMES[d]}" for d in highs] + [f"low {_DISC_NAMES[d]}" for d in lows]
+    if not described:
+        described = [f"balanced {_DISC_NAMES[d]}" for d in mediums]
+    if len(described) > 1:
+        described = [', '.join(described[:-1]) + ' and ' + described[-1]]
+
+    if leading:
+        thrive = f"roles that reward {_DISC_REWARDS[leading[0]]}"
+        if len(leading) > 1:
+            thrive += f", with {_DISC_SECONDARY[leading[1]]}"
+    else:
+        thrive = "roles that play to your quieter strengths"
+    sentence = f"Your DISC profile — {described[0]} — suggests you thrive in {thrive}"
+    if lows:
+        sentence += (',' if len(leading) > 1 else '') + " rather than " + ' or '.join(_DISC_DRAINS[d] for d in lows[:2])
+    return sentence + '.', (leading[0] if leading else None)
+
+def _compile_career(primary, sun_slot: int) -> str:
+    if primary is not None:
+        areas = _DISC_CAREERS[primary]
+    elif sun_slot != _NO_SIGN:
+        areas = _ELEMENT_CAREERS[_SIGN_ELEMENTS[sun_slot]]
+    else:
+        areas = "project work, client services, or operations — roles where your strengths have room to grow"
+    return f"A fulfilling career path for you could be in areas like {areas}."
+
+def _compile_closing(sun, primary) -> str:
+    offer = _DISC_OFFERS[primary] if primary is not None else "offer clear goals and room to grow"
+    if sun:
+        return (f"To maximize satisfaction, look for positions that {_SUN_NEEDS[sun]} "
+                f"(so your {sun} strengths are honored) but {offer}.")
+    return f"To maximize satisfaction, look for positions that {offer}."
+
+def _disc_code(levels) -> int:
+    """Index of a DISC level vector read as a base-4 number (0-255)."""
+    return levels[0] << 6 | levels[1] << 4 | levels[2] << 2 | levels[3]
+
+def _disc_levels(code: int) -> tuple:
+    return (code >> 6 & 3, code >> 4 & 3, code >> 2 & 3, code & 3)
+
+def _compile_fallback_tables():
+    signs = list(ZODIAC_SIGNS) + [None]
+    openings = tuple(tuple(_compile_opening(sun, asc) for asc in signs) for sun in signs)
+    disc = tuple(_compile_disc(_disc_levels(code)) for code in range(256))
+    primaries = list(range(len(DISC_DIMENSIONS))) + [None]
+    careers = {(p, s): _compile_career(p, s) for p in primaries for s in range(len(signs))}
+    closings = {(p, s): _compile_closing(signs[s], p) for p in primaries for s in range(len(signs))}
+    return openings, disc, careers, closings
+
+_FALLBACK_OPENINGS, _FALLBACK_DISC, _FALLBACK_CAREERS, _FALLBACK_CLOSINGS = _compile_fallback_tables()
+
+def generate_fallback_paragraph(birth_chart: str, disc: str) -> str:
+    """
+    Rule-based paragraph generator that synthesizes the two data points into a friendly paragraph.
+    This allows the app to work offline and satisfies the "single paragraph" output requirement.
+
+    Sun sign, ascendant and the DISC level pattern each select a precompiled sentence, so the
+    paragraph is personalized yet assembled with constant-time table lookups.
+    """
+    chart = parse_birth_chart(birth_chart)
+    levels = parse_disc_profile(disc).levels
+    sun_slot = _SIGN_SLOT.get(chart.sun, _NO_SIGN)
+    asc_slot = _SIGN_SLOT.get(chart.ascendant, _NO_SIGN)
+    disc_sentence, primary = _FALLBACK_DISC[_disc_code(levels)]
+
+    # Ensure single paragraph: one space-joined run of sentences
+    parts = (
+        _FALLBACK_OPENINGS[sun_slot][asc_slot],
+        disc_sentence,
+        _FALLBACK_CAREERS[primary, sun_slot],
+        _FALLBACK_CLOSINGS[primary, sun_slot],
+    )
+    return ' '.join(part for part in parts if part)
+
+# =====================
+# Response cache
+# =====================
+def _normalize_text(value: str) -> str:
+    return ' '.join(value.casefold().split()).strip(' .;,')
+
+def report_cache_key(birth_chart: str, disc: str) -> str:
+    """
+    Cache key that ignores spelling differences. Charts and DISC profiles the parsers
+    fully understand key on their canonical form; anything else keys on
+    case/space-normalized text.
+    """
+    chart = parse_birth_chart(birth_chart)
+    chart_key = chart.canonical if chart.complete else _normalize_text(birth_chart)
+    profile = parse_disc_profile(disc)
+    disc_key = profile.canonical if profile.complete else _normalize_text(disc)
+    return f"{chart_key}|{disc_key}"
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with stale-while-revalidate expiry and hit/miss/eviction counters.
+
+    Entries younger than `soft_ttl` are fresh. Between `soft_ttl` and `ttl` they are stale:
+    still served, but the first reader claims a refresh (see claim_refresh()). After `ttl`
+    they are gone. A `soft_ttl` of 0 or >= `ttl` turns stale serving off.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, soft_ttl: float = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.soft_ttl = soft_ttl if 0 < soft_ttl < ttl else ttl
+        self._entries = OrderedDict()  # key -> [soft_expires_at, expires_at, value, refresh_claimed_at]
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self.stale_hits = self.refreshes = 0
+
+    def lookup(self, key):
+        """Return (value, stale) for key, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            stale = entry[0] <= now
+            self.stale_hits += stale
+            return entry[2], stale
+
+    def get(self, key):
+        found = self.lookup(key)
+        return found[0] if found is not None else None
+
+    def claim_refresh(self, key, retry_after: float) -> bool:
+        """
+        True for the one caller that should refresh a stale entry. Another claim is granted
+        only after `retry_after` seconds, in case that refresh failed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] > now:
+                return False
+            if entry[3] is not None and now - entry[3] < retry_after:
+                return False
+            entry[3] = now
+            self.refreshes += 1
+            return True
+
+    def set(self, key, value, stale: bool = False) -> None:
+        """Store value; `stale` entries (e.g. old reports loaded from disk) are due a refresh at once."""
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = [now if stale else now + self.soft_ttl, now + self.ttl, value, None]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'soft_ttl': self.soft_ttl,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'refreshes': self.refreshes,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+RESPONSE_CACHE = ResponseCache(REPORT_CACHE_SIZE, REPORT_CACHE_TTL, REPORT_CACHE_SOFT_TTL)
+
+class EventLog:
+    """Append-only list of (event, value) pairs that any number of readers replay from the start and follow."""
+
+    def __init__(self):
+        self._events = []
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def append(self, event, value) -> None:
+        with self._cond:
+            self._events.append((event, value))
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def follow(self, give_up_at: float):
+        """Yield every event, waiting for new ones until close(); raises FutureTimeoutError at give_up_at (monotonic)."""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self._events) and not self._closed:
+                    remaining = give_up_at - time.monotonic()
+                    if remaining <= 0:
+                        raise FutureTimeoutError()
+                    self._cond.wait(remaining)
+                if index >= len(self._events):
+                    return
+                batch = self._events[index:]
+            index += len(batch)
+            yield from batch
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller (the leader) starts the
+    function, and every caller waits on one Future for its result or exception. Callers share
+    one timeout, measured from when the leader started, and may each bring a tighter deadline.
+    Streaming calls also record their events, so followers see the same text as it arrives.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._calls = {}  # key -> (Future, started_at, EventLog or None)
+        self._tasks = set()
+        self._lock = threading.Lock()
+        self.leaders = self.coalesced = self.timeouts = 0
+
+    def _join(self, key, log=None):
+        """
+        Return (future, started_at, is_leader, log) for key, registering a new call (recording into
+        `log`, if given) when none is in flight.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = (Future(), time.monotonic(), log)
+                # Running futures can't be cancelled by an impatient follower
+                call[0].set_running_or_notify_cancel()
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        return call[0], call[1], leader, call[2]
+
+    def _leave(self, key) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def _remaining(self, started_at: float) -> float:
+        return max(0.0, started_at + self.timeout - time.monotonic())
+
+    def start(self, key, fn, executor):
+        """
+        Return (future, started_at) for key. The leader submits fn to executor instead of running
+        it, so the call carries on even if every caller stops waiting (see wait()).
+        """
+        future, started_at, leader, _ = self._join(key)
+        if leader:
+            def run():
+                try:
+                    future.set_result(fn())
+                except BaseException as e:
+                    future.set_exception(e)
+                finally:
+                    self._leave(key)
+            executor.submit(run)
+        return future, started_at
+
+    def start_async(self, key, coro_fn):
+        """
+        Async variant of start(): the leader runs coro_fn as a task on the running loop. Shares
+        in-flight calls with start(), so async handlers and request threads coalesce.
+        """
+        future, started_at, leader, _ = self._join(key)
+        if leader:
+            async def run():
+                try:
+                    future.set_result(await coro_fn())
+                except asyncio.CancelledError:
+                    future.set_exception(RuntimeError('leading request was cancelled'))
+                    raise
+                except BaseException as e:
+                    future.set_exception(e)
+                finally:
+                    self._leave(key)
+            task = asyncio.ensure_future(run())
+            self._tasks.add(task)  # the loop only keeps weak references to tasks
+            task.add_done_callback(self._tasks.discard)
+        return future, started_at
+
+    def start_stream(self, key, events_fn, executor):
+        """
+        Streaming variant of start(): events_fn() yields (event, value) pairs ending with
+        ('done', result). Every other event goes into an EventLog that followers replay with
+        follow(). Returns (future, started_at, log); log is None when the key is already in flight
+        as a non-streaming call, whose result is only available through wait().
+        """
+        future, started_at, leader, log = self._join(key, EventLog())
+        if leader:
+            def run():
+                result = None
+                try:
+                    for event, value in events_fn():
+                        if event == 'done':
+                            result = value
+                        else:
+                            log.append(event, value)
+                    future.set_result(result)
+                except BaseException as e:
+                    future.set_exception(e)
+                finally:
+                    log.close()
+                    self._leave(key)
+            executor.submit(run)
+        return future, started_at, log
+
+    def _wait_timeout(self, started_at: float, deadline, extra: float = 0) -> float:
+        timeout = self._remaining(started_at) + extra
+        if deadline is not None:
+            timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+        return timeout
+
+    def wait(self, future, started_at: float, deadline=None, extra: float = 0):
+        """
+        Result of a started call, waiting until the shared timeout (plus `extra` seconds) or
+        `deadline` (monotonic).
+        """
+        try:
+            return future.result(timeout=self._wait_timeout(started_at, deadline, extra))
+        except FutureTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    def follow(self, log, started_at: float, deadline=None):
+        """Yield a streaming call's events as they arrive, with the same timeouts as wait()."""
+        give_up_at = time.monotonic() + self._wait_timeout(started_at, deadline)
+        try:
+            yield from log.follow(give_up_at)
+        except FutureTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    async def wait_async(self, future, started_at: float, deadline=None):
+        try:
+            # shield() keeps a caller's timeout from cancelling the shared future
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), timeout=self._wait_timeout(started_at, deadline)
+            )
+        except (asyncio.TimeoutError, FutureTimeoutError):
+            with self._lock:
+                self.timeouts += 1
+            raise FutureTimeoutError()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'timeouts': self.timeouts,
+            }
+
+SINGLE_FLIGHT = SingleFlight(SINGLE_FLIGHT_TIMEOUT)
+# Runs Gemini calls on behalf of waiting requests; a call outlives its request if the deadline passes
+GEMINI_BACKGROUND = ThreadPoolExecutor(max_workers=GEMINI_BACKGROUND_WORKERS, thread_name_prefix='gemini')
+
+# =====================
+# Request deadlines
+# =====================
+DEADLINE_STATS = {'fallbacks': 0, 'background_completed': 0, 'background_failed': 0}
+_deadline_lock = threading.Lock()
+_background_calls = set()  # futures whose requests already gave up on them
+
+def request_deadline(seconds: float):
+    """Absolute time.monotonic() deadline `seconds` from now, or None when seconds <= 0."""
+    return time.monotonic() + seconds if seconds > 0 else None
+
+def _deadline_passed(deadline) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+def _background_call_finished(future) -> None:
+    failed = future.exception() is not None or future.result() is None
+    with _deadline_lock:
+        _background_calls.discard(future)
+        DEADLINE_STATS['background_failed' if failed else 'background_completed'] += 1
+
+def _record_deadline_fallback(future=None) -> None:
+    """Count a request served by the fallback at its deadline; `future` is the call it left running."""
+    print("⏱️  Request deadline reached, serving fallback while Gemini finishes in the background")
+    with _deadline_lock:
+        DEADLINE_STATS['fallbacks'] += 1
+        watch = future is not None and future not in _background_calls
+        if watch:
+            _background_calls.add(future)
+    if watch:
+        future.add_done_callback(_background_call_finished)
+
+# =====================
+# Persistent report store
+# =====================
+REPORT_STORE_BATCH = 100          # rows per write-behind commit
+REPORT_STORE_FLUSH_SECONDS = 0.5  # longest a queued row waits for its commit
+_REPORT_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    prompt_version TEXT NOT NULL,
+    key TEXT NOT NULL,
+    birth TEXT NOT NULL,
+    disc TEXT NOT NULL,
+    paragraph TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (prompt_version, key)
+) WITHOUT ROWID
+"""
+
+class ReportStore:
+    """
+    SQLite store of generated reports keyed by (PROMPT_VERSION, normalized cache key).
+
+    Reads go straight to the database on a per-thread connection. Writes are queued and
+    committed in batches by one background thread. The database runs in WAL mode, so every
+    worker process on the host can read while one of them writes.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self.enabled = bool(path)
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._writer = None
+        self.hits = self.misses = self.written = self.commits = self.errors = 0
+        if self.enabled:
+            try:
+                connection = self._connect()
+                connection.execute("PRAGMA journal_mode = WAL")
+                connection.execute(_REPORT_STORE_SCHEMA)
+                connection.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  Report store {path} unavailable, continuing without it: {e}")
+                self.enabled = False
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def _reader(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def get(self, key: str):
+        """Return (paragraph, age in seconds) for key under the current prompt version, or None."""
+        if not self.enabled:
+            return None
+        try:
+            row = self._reader().execute(
+                "SELECT paragraph, created_at FROM reports WHERE prompt_version = ? AND key = ?",
+                (PROMPT_VERSION, key),
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️  Report store read failed: {e}")
+            with self._lock:
+                self.errors += 1
+            return None
+        age = time.time() - row[1] if row is not None else None
+        with self._lock:
+            if row is None or (self.ttl > 0 and age > self.ttl):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0], age
+
+    def put(self, key: str, birth_chart: str, disc: str, paragraph: str) -> None:
+        """Queue a report for the write-behind thread; never blocks on the database."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name='report-store', daemon=True)
+                self._writer.start()
+        self._queue.put((PROMPT_VERSION, key, birth_chart, disc, paragraph, time.time()))
+
+    def _write_loop(self) -> None:
+        connection = self._connect()
+        while True:
+            rows = [self._queue.get()]
+            deadline = time.monotonic() + REPORT_STORE_FLUSH_SECONDS
+            while len(rows) < REPORT_STORE_BATCH:
+                try:
+                    rows.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            stop = None in rows
+            rows = [row for row in rows if row is not None]
+            try:
+                connection.executemany("INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?)", rows)
+                connection.commit()
+                with self._lock:
+                    self.written += len(rows)
+                    self.commits += 1
+            except sqlite3.Error as e:
+                print(f"⚠️  Report store write of {len(rows)} reports failed: {e}")
+                with self._lock:
+                    self.errors += 1
+            if stop:
+                connection.close()
+                return
+
+    def close(self) -> None:
+        """Commit everything queued so far and stop the writer (registered with atexit)."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join(timeout=10)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'prompt_version': PROMPT_VERSION,
+                'hits': self.hits,
+                'misses': self.misses,
+                'pending_writes': self._queue.qsize(),
+                'written': self.written,
+                'commits': self.commits,
+                'errors': self.errors,
+            }
+
+REPORT_STORE = ReportStore(REPORT_STORE_PATH, REPORT_STORE_TTL)
+atexit.register(REPORT_STORE.close)
+
+def remember_report(key: str, birth_chart: str, disc: str, paragraph: str) -> None:
+    """Keep a fresh Gemini paragraph in the response cache and the persistent store."""
+    RESPONSE_CACHE.set(key, paragraph)
+    REPORT_STORE.put(key, birth_chart, disc, paragraph)
+
+# =====================
+# Precomputed report table
+# =====================
+# Patterns people actually submit: each dimension High, Low or not given, at least one High.
+# 65 patterns x 144 Sun/Ascendant pairs = 9,360 reports.
+REPORT_TABLE_DISC_CODES = tuple(
+    code for code in range(256)
+    if 2 not in _disc_levels(code) and 3 in _disc_levels(code)
+)
+_REPORT_TABLE_CODE_SET = frozenset(REPORT_TABLE_DISC_CODES)
+_REPORT_TABLE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,   -- (sun * 12 + ascendant) * 256 + DISC code
+    birth TEXT NOT NULL,
+    disc TEXT NOT NULL,
+    paragraph TEXT NOT NULL,
+    source TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+def report_table_id(birth_chart: str, disc: str):
+    """
+    Row id for the inputs, or None when they fall outside the table: the chart must be
+    exactly a Sun and an Ascendant and the DISC profile one of REPORT_TABLE_DISC_CODES.
+    """
+    chart = parse_birth_chart(birth_chart)
+    if not chart.complete or len(chart.placements) != 2 or not (chart.sun and chart.ascendant):
+        return None
+    profile = parse_disc_profile(disc)
+    if not profile.complete:
+        return None
+    code = _disc_code(profile.levels)
+    if code not in _REPORT_TABLE_CODE_SET:
+        return None
+    return (_SIGN_SLOT[chart.sun] * len(ZODIAC_SIGNS) + _SIGN_SLOT[chart.ascendant]) * 256 + code
+
+
+class ReportTable:
+    """
+    Read-only view of the precomputed SQLite report table. Each thread gets its own
+    memory-mapped connection, so a lookup is a primary-key read with no locking.
+    Only Gemini-written rows are served; fallback rows would match the live fallback anyway.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._generation = 0  # bumped by reload() so threads reopen the file
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.hits = self.misses = self.errors = 0
+        self.reload()
+
+    def reload(self) -> None:
+        rows = 0
+        if os.path.exists(self.path):
+            try:
+                connection = sqlite3.connect(self.path)
+                try:
+                    rows = connection.execute(
+                        "SELECT COUNT(*) FROM reports WHERE source = 'Gemini API'"
+                    ).fetchone()[0]
+                finally:
+                    connection.close()
+            except sqlite3.Error as e:
+                print(f"⚠️  Report table {self.path} is unreadable: {e}")
+        with self._lock:
+            self.rows = rows
+            self._generation += 1
+        if rows:
+            print(f"📚 Report table loaded: {rows:,} precomputed reports")
+
+    def _connection(self):
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            if getattr(local, 'connection', None) is not None:
+                local.connection.close()
+            local.connection = sqlite3.connect(self.path, check_same_thread=False)
+            local.connection.execute("PRAGMA query_only = ON")
+            local.connection.execute("PRAGMA mmap_size = 67108864")
+            local.generation = self._generation
+        return local.connection
+
+    def get(self, birth_chart: str, disc: str):
+        if not self.rows:
+            return None
+        row_id = report_table_id(birth_chart, disc)
+        if row_id is None:
+            return None
+        try:
+            row = self._connection().execute(
+                "SELECT paragraph FROM reports WHERE id = ? AND source = 'Gemini API'", (row_id,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️  Report table lookup failed: {e}")
+            with self._lock:
+                self.errors += 1
+            return None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': bool(self.rows),
+                'rows': self.rows,
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+            }
+
+REPORT_TABLE = ReportTable(REPORT_TABLE_PATH)
+
+def lookup_report(key: str, birth_chart: str, disc: str):
+    """
+    Return (paragraph, source) from the response cache, the persistent store or the report
+    table, or None. A stale entry is still returned; the first reader also starts its
+    background refresh. Store hits are copied into the response cache.
+    """
+    found = RESPONSE_CACHE.lookup(key)
+    source = 'cache'
+    if found is None:
+        stored = REPORT_STORE.get(key)
+        if stored is not None:
+            paragraph, age = stored
+            stale = age >= RESPONSE_CACHE.soft_ttl
+            RESPONSE_CACHE.set(key, paragraph, stale=stale)
+            found, source = (paragraph, stale), 'store'
+    if found is not None:
+        paragraph, stale = found
+        if stale and GEMINI_AVAILABLE and RESPONSE_CACHE.claim_refresh(key, SINGLE_FLIGHT_TIMEOUT):
+            print("🔄 Serving stale report while it is refreshed in the background")
+            SINGLE_FLIGHT.start(key, lambda: fetch_into_cache(key, birth_chart, disc), GEMINI_BACKGROUND)
+        return paragraph, source
+    paragraph = REPORT_TABLE.get(birth_chart, disc)
+    if paragraph is not None:
+        return paragraph, 'table'
+    return None
+
+# =====================
+# Outbound rate limiting
+# =====================
+class TokenBucket:
+    """Refills at `per_minute / 60` units per second up to `per_minute`. Not thread-safe on its own."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` units are available (the level may already be negative)."""
+        return max(0.0, (amount - self.level) / self.rate)
+
+class RateLimiter:
+    """
+    Shared requests-per-minute and tokens-per-minute budget for outbound Gemini calls.
+
+    A call reserves its cost up front. If the budget can cover it within `max_wait` seconds and
+    fewer than `max_queue` calls are already waiting, it sleeps until its turn; otherwise it is
+    rejected at once so the caller can fall back without spending a round trip on a 429.
+    """
+
+    def __init__(self, rpm: float, tpm: float, max_wait: float, max_queue: int):
+        self.buckets = {
+            name: TokenBucket(limit) for name, limit in (('requests', rpm), ('tokens', tpm)) if limit > 0
+        }
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.admitted = self.queued = self.rejected = 0
+
+    def _reserve(self, tokens: float, max_wait):
+        """Return seconds to wait before calling, or None if the call is rejected."""
+        cost = {'requests': 1, 'tokens': tokens}
+        patient = max_wait is not None
+        max_wait = self.max_wait if max_wait is None else max_wait
+        now = time.monotonic()
+        with self._lock:
+            wait = 0.0
+            for name, bucket in self.buckets.items():
+                bucket.refill(now)
+                wait = max(wait, bucket.wait_for(min(cost[name], bucket.capacity)))
+            if wait > 0 and (wait > max_wait or (not patient and self.waiting >= self.max_queue)):
+                self.rejected += 1
+                return None
+            for name, bucket in self.buckets.items():
+                bucket.level -= cost[name]
+            self.admitted += 1
+            if wait > 0:
+                self.queued += 1
+                self.waiting += 1
+            return wait
+
+    def _done_waiting(self) -> None:
+        with self._lock:
+            self.waiting -= 1
+
+    def acquire(self, tokens: float, max_wait=None) -> bool:
+        """
+        Reserve one call costing `tokens`; True once it may proceed. Passing `max_wait` overrides
+        the configured wait limit and skips the queue limit (for offline jobs that prefer to wait).
+        """
+        wait = self._reserve(tokens, max_wait)
+        if wait is None:
+            return False
+        if wait:
+            try:
+                time.sleep(wait)
+            finally:
+                self._done_waiting()
+        return True
+
+    async def acquire_async(self, tokens: float, max_wait=None) -> bool:
+        """Async counterpart of acquire(); waits without blocking the event loop."""
+        wait = self._reserve(tokens, max_wait)
+        if wait is None:
+            return False
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._done_waiting()
+        return True
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            budgets = {}
+            for name, bucket in self.buckets.items():
+                bucket.refill(now)
+                budgets[name] = {'per_minute': bucket.capacity, 'available': round(bucket.level, 1)}
+            return {
+                'budgets': budgets,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected': self.rejected,
+            }
+
+RATE_LIMITER = RateLimiter(GEMINI_RPM, GEMINI_TPM, GEMINI_RATE_MAX_WAIT, GEMINI_RATE_MAX_QUEUE)
+# Offline jobs (--batch, --build-table) have no one waiting on them, so each call may queue this
+# many seconds for rate budget instead of falling back
+OFFLINE_RATE_WAIT = 300.0
+
+def estimate_call_tokens(prompt: str) -> int:
+    """Quota cost of one call: prompt tokens (~4 characters each) plus the output cap."""
+    return len(prompt) // 4 + GEMINI_MAX_OUTPUT_TOKENS
+
+# =====================
+# Hedged requests
+# =====================
+class HedgePolicy:
+    """
+    Decides when a slow call earns a hedge and measures whether hedging pays off.
+
+    A hedge is sent once the primary has run past its own p90 latency, as long as hedges stay
+    under `percent` of recent requests. Cancelled losers hide how slow the primary would have
+    been, so a random `holdout` share of requests is never hedged and serves as the baseline
+    for the p99 comparison.
+    """
+
+    def __init__(self, percent: float, min_samples: int, holdout: float, window: int = 1000):
+        self.percent = percent
+        self.min_samples = min_samples
+        self.holdout = holdout
+        self._treated = deque(maxlen=window)  # (latency, hedged) for requests that may hedge
+        self._control = deque(maxlen=window)  # latencies of held-out requests
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self.requests = self.hedged = self.hedge_wins = self.budget_denied = 0
+
+    def delay_for(self, breaker):
+        """
+        Return (seconds to wait on `breaker` before hedging or None, held_out). Held-out
+        requests and models without enough latency samples are not hedged.
+        """
+        if self.percent <= 0:
+            return None, False
+        delay = breaker.latency_percentile(0.9, self.min_samples)
+        if delay is None:
+            return None, False
+        if random.random() < self.holdout / 100:
+            return None, True
+        return delay, False
+
+    def reserve(self) -> bool:
+        with self._lock:
+            hedged = sum(1 for _, was_hedged in self._treated if was_hedged) + self._outstanding
+            if hedged + 1 > self.percent / 100 * (len(self._treated) + 1):
+                self.budget_denied += 1
+                return False
+            self._outstanding += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._outstanding -= 1
+
+    def record_request(self, latency: float, delay=None, held_out: bool = False,
+                       hedged: bool = False, hedge_won: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            if hedged:
+                self._outstanding -= 1
+                self.hedged += 1
+                self.hedge_wins += hedge_won
+            if held_out:
+                self._control.append(latency)
+            elif delay is not None:
+                self._treated.append((latency, hedged))
+
+    def stats(self) -> dict:
+        with self._lock:
+            treated = [latency for latency, _ in self._treated]
+            control = list(self._control)
+            requests, hedged, wins, denied = self.requests, self.hedged, self.hedge_wins, self.budget_denied
+        p99 = _percentile(treated, 0.99) if treated else None
+        p99_control = _percentile(control, 0.99) if control else None
+        return {
+            'percent': self.percent,
+            'requests': requests,
+            'hedged': hedged,
+            'hedge_rate': round(hedged / requests, 4) if requests else 0.0,
+            'hedge_wins': wins,
+            'budget_denied': denied,
+            'p99_ms': round(p99 * 1000, 1) if p99 is not None else None,
+            'p99_holdout_ms': round(p99_control * 1000, 1) if p99_control is not None else None,
+            'p99_improvement_ms': (
+                round((p99_control - p99) * 1000, 1) if p99 is not None and p99_control is not None else None
+            ),
+        }
+
+HEDGING = HedgePolicy(GEMINI_HEDGE_PERCENT, GEMINI_HEDGE_MIN_SAMPLES, GEMINI_HEDGE_HOLDOUT)
+# Primary and hedge calls race here; kept apart from GEMINI_BACKGROUND, whose workers wait on them
+HEDGE_POOL = ThreadPoolExecutor(max_workers=GEMINI_BACKGROUND_WORKERS * 2, thread_name_prefix='hedge')
+
+# =====================
+# Gemini API Integration
+# =====================
+def build_gemini_prompt(birth_chart: str, disc: str) -> str:
+    # Construct the prompt as specified in the assessment
+    return f"""Synthesize a career recommendation based on a person with a birth chart indicating '{birth_chart}' and a DISC profile of '{disc}'. 
+
+The final output should be a single paragraph written in a friendly, conversational tone, suitable for a personalized report. 
+
+Key themes to explore:
+- Balancing an innate desire for harmony with a disciplined work ethic
+- Leveraging a detail-oriented nature in a role that values structure
+- Finding career paths that align with both astrological and personality traits
+
+Please provide exactly one well-structured paragraph that synthesizes these insights into actionable career advice."""
+
+# Stored reports are only reused while the prompt that produced them is unchanged
+PROMPT_VERSION = PROMPT_VERSION or hashlib.sha256(
+    build_gemini_prompt('{birth_chart}', '{disc}').encode('utf-8')
+).hexdigest()[:12]
+
+def clean_gemini_paragraph(text: str) -> str:
+    # Clean and format the response
+    paragraph = text.strip()
+    
+    # Ensure it's a single paragraph (remove extra line breaks)
+    paragraph = ' '.join(paragraph.split())
+    
+    # If response is too long, truncate to reasonable length
+    if len(paragraph) > 500:
+        sentences = paragraph.split('. ')
+        paragraph = '. '.join(sentences[:3]) + '.'
+    
+    return paragraph
+
+class ParagraphStream:
+    """
+    Incremental clean_gemini_paragraph() for streamed chunks.
+
+    feed() collapses whitespace as chunks arrive and returns the text that is safe to show.
+    Anything after the third sentence is held back until the stream ends, because the
+    final paragraph is cut to three sentences if it runs over 500 characters.
+    """
+    MAX_CHARS = 500
+    MAX_SENTENCES = 3
+
+    def __init__(self):
+        self.text = ''        # whitespace-normalized text received so far
+        self.emitted = 0      # characters of self.text already handed out
+        self._gap = False     # previous chunk ended in whitespace
+        self._cut = None      # end of the third sentence, once seen
+        self._sentences = 0
+        self._scan_from = 0
+
+    def feed(self, chunk: str) -> str:
+        words = chunk.split()
+        if not words:
+            self._gap = self._gap or bool(chunk)
+            return ''
+        piece = ' '.join(words)
+        if self.text and (self._gap or chunk[0].isspace()):
+            piece = ' ' + piece
+        self.text += piece
+        self._gap = chunk[-1].isspace()
+
+        while self._cut is None:
+            found = self.text.find('. ', self._scan_from)
+            if found == -1:
+                # A '.' at the very end may still become '. ' with the next chunk
+                self._scan_from = max(self._scan_from, len(self.text) - 1)
+                break
+            self._sentences += 1
+            self._scan_from = found + 2
+            if self._sentences == self.MAX_SENTENCES:
+                self._cut = found + 1
+
+        safe_end = self._cut if self._cut is not None else len(self.text)
+        out = self.text[self.emitted:safe_end]
+        self.emitted = max(self.emitted, safe_end)
+        return out
+
+    @property
+    def complete(self) -> bool:
+        """True once the paragraph is known to end at the third sentence."""
+        return self._cut is not None and len(self.text) > self.MAX_CHARS
+
+    def finish(self):
+        """Return (remaining text to show, final paragraph)."""
+        final = clean_gemini_paragraph(self.text)
+        return final[self.emitted:], final
+
+# Totals for paragraphs cut short by early stopping, reported in /metrics
+EARLY_STOP_STATS = {'early_stops': 0, 'chars_discarded': 0, 'tokens_saved_est': 0, 'seconds_saved_est': 0.0}
+_early_stop_lock = threading.Lock()
+
+def _chunk_token_count(chunk):
+    usage = getattr(chunk, 'usage_metadata', None)
+    return getattr(usage, 'candidates_token_count', None) or None
+
+def _cancel_stream(response) -> None:
+    """Best effort: stop the upstream stream so the model stops generating tokens."""
+    iterator = getattr(response, '_iterator', None)
+    for target in (iterator, response):
+        for method in ('cancel', 'close'):
+            fn = getattr(target, method, None)
+            if callable(fn):
+                try:
+                    fn()
+                    return
+                except Exception:
+                    pass
+
+def _record_early_stop(model_name: str, stream: ParagraphStream, paragraph: str,
+                       tokens_received: int, elapsed: float) -> None:
+    """Log and tally what stopping early saved, estimated from the stream's own throughput."""
+    tokens_saved = max(0, GEMINI_MAX_OUTPUT_TOKENS - tokens_received)
+    seconds_saved = tokens_saved * elapsed / tokens_received if tokens_received else 0.0
+    discarded = len(stream.text) - len(paragraph)
+    with _early_stop_lock:
+        EARLY_STOP_STATS['early_stops'] += 1
+        EARLY_STOP_STATS['chars_discarded'] += discarded
+        EARLY_STOP_STATS['tokens_saved_est'] += tokens_saved
+        EARLY_STOP_STATS['seconds_saved_est'] = round(EARLY_STOP_STATS['seconds_saved_est'] + seconds_saved, 3)
+    print(f"✂️  Early stop on {model_name} after {tokens_received} tokens / {elapsed:.2f}s: "
+          f"discarded {discarded} chars, saved up to ~{tokens_saved} tokens / ~{seconds_saved:.1f}s")
+
+def _stream_from_model(breaker, prompt: str):
+    """
+    Stream one model's answer through ParagraphStream. Yields ('chunk', text) as text becomes
+    safe to show and finally ('final', paragraph). Once the paragraph is known to end at its
+    third sentence the upstream stream is cancelled instead of being read to the end.
+    """
+    started = time.perf_counter()
+    stream = ParagraphStream()
+    tokens_received = 0
+    response = breaker.model.generate_content(
+        prompt, stream=True, generation_config={'max_output_tokens': GEMINI_MAX_OUTPUT_TOKENS},
+        request_options={'timeout': GEMINI_CALL_TIMEOUT},
+    )
+    finished = False
+    try:
+        for chunk in response:
+            tokens_received = _chunk_token_count(chunk) or tokens_received + 1
+            text = stream.feed(chunk.text or '')
+            if text:
+                yield 'chunk', text
+            if stream.complete:
+                break
+        else:
+            finished = True
+    finally:
+        if not finished:
+            _cancel_stream(response)
+    tail, paragraph = stream.finish()
+    if not finished and stream.complete:
+        _record_early_stop(breaker.name, stream, paragraph, tokens_received, time.perf_counter() - started)
+    if tail:
+        yield 'chunk', tail
+    yield 'final', paragraph
+
+def _model_call_failed(breaker, started: float, error) -> None:
+    breaker.record_failure(time.perf_counter() - started, error)
+    print(f"⚠️  Gemini API error from {breaker.name}: {error}")
+    if breaker.model is GEMINI_MODEL:
+        # Don't let the next restart trust a model that is failing now
+        invalidate_model_cache()
+
+def _model_call_finished(breaker, started: float, paragraph: str, promote: bool = True) -> bool:
+    """
+    Record the outcome of a completed call; returns True if the paragraph is usable.
+    A successful model other than the active one becomes active unless `promote` is False (hedges).
+    """
+    if not paragraph:
+        breaker.record_failure(time.perf_counter() - started, 'empty response')
+        print(f"⚠️  Gemini model {breaker.name} returned empty response")
+        return False
+    breaker.record_success(time.perf_counter() - started)
+    if promote and breaker.model is not GEMINI_MODEL:
+        print(f"🔀 Switching active Gemini model to: {breaker.name}")
+        _set_active_model(breaker.model)
+    return True
+
+def _gemini_events(birth_chart: str, disc: str, rate_wait=None):
+    """
+    Try healthy models in priority order, skipping any whose circuit breaker is open, so a
+    failing model costs one error round trip at most until its breaker trips. Every attempt
+    is admitted by RATE_LIMITER first (see RateLimiter.acquire for `rate_wait`).
+
+    Yields ('chunk', text), ('reset', None) when a model fails after text was shown, and
+    finally ('done', paragraph) -- paragraph is None if no model answered.
+    """
+    prompt = build_gemini_prompt(birth_chart, disc)
+    cost = estimate_call_tokens(prompt)
+    for breaker in MODEL_REGISTRY.healthy():
+        if not RATE_LIMITER.acquire(cost, rate_wait):
+            breaker.release()
+            print("🚦 Gemini rate budget exhausted, using fallback")
+            yield 'done', None
+            return
+        started = time.perf_counter()
+        shown = False
+        paragraph = ''
+        try:
+            # Generate response using Gemini
+            for kind, value in _stream_from_model(breaker, prompt):
+                if kind == 'chunk':
+                    shown = True
+                    yield 'chunk', value
+                else:
+                    paragraph = value
+        except Exception as e:
+            _model_call_failed(breaker, started, e)
+            if shown:
+                yield 'reset', None
+            continue
+
+        if _model_call_finished(breaker, started, paragraph):
+            yield 'done', paragraph
+            return
+
+    print("⚠️  No healthy Gemini model answered, using fallback")
+    yield 'done', None
+
+async def _cancel_stream_async(response) -> None:
+    """Async counterpart of _cancel_stream()."""
+    iterator = getattr(response, '_iterator', None)
+    for target in (iterator, response):
+        for method in ('aclose', 'cancel', 'close'):
+            fn = getattr(target, method, None)
+            if callable(fn):
+                try:
+                    result = fn()
+                    if asyncio.iscoroutine(result):
+                        await result
+                    return
+                except Exception:
+                    pass
+
+async def _stream_from_model_async(breaker, prompt: str):
+    """Async counterpart of _stream_from_model(), using the non-blocking Gemini client."""
+    started = time.perf_counter()
+    stream = ParagraphStream()
+    tokens_received = 0
+    response = await breaker.model.generate_content_async(
+        prompt, stream=True, generation_config={'max_output_tokens': GEMINI_MAX_OUTPUT_TOKENS},
+        request_options={'timeout': GEMINI_CALL_TIMEOUT},
+    )
+    finished = False
+    try:
+        async for chunk in response:
+            tokens_received = _chunk_token_count(chunk) or tokens_received + 1
+            text = stream.feed(chunk.text or '')
+            if text:
+                yield 'chunk', text
+            if stream.complete:
+                break
+        else:
+            finished = True
+    finally:
+        if not finished:
+            await _cancel_stream_async(response)
+    tail, paragraph = stream.finish()
+    if not finished and stream.complete:
+        _record_early_stop(breaker.name, stream, paragraph, tokens_received, time.perf_counter() - started)
+    if tail:
+        yield 'chunk', tail
+    yield 'final', paragraph
+
+async def _call_model_async(breaker, prompt: str, promote: bool = True):
+    """Async counterpart of _call_model(); cancel the task to abandon the call."""
+    started = time.perf_counter()
+    paragraph = ''
+    try:
+        async for kind, value in _stream_from_model_async(breaker, prompt):
+            if kind == 'final':
+                paragraph = value
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+    except Exception as e:
+        _model_call_failed(breaker, started, e)
+        return None
+    if not _model_call_finished(breaker, started, paragraph, promote):
+        return None
+    return paragraph
+
+async def _call_with_hedge_async(primary, breakers, prompt: str, cost: float):
+    """Async counterpart of _call_with_hedge(); the losing call's task is cancelled."""
+    delay, held_out = HEDGING.delay_for(primary)
+    started = time.perf_counter()
+    if delay is None:
+        paragraph = await _call_model_async(primary, prompt)
+        HEDGING.record_request(time.perf_counter() - started, held_out=held_out)
+        return paragraph
+
+    primary_task = asyncio.ensure_future(_call_model_async(primary, prompt))
+    pending = {primary_task}
+    hedge = hedge_task = None
+    paragraph = winner = None
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done:
+            hedge = _next_hedge(breakers, cost)
+            if hedge is not None:
+                print(f"🪁 {primary.name} slower than its p90 ({delay:.2f}s), hedging to {hedge.name}")
+                hedge_task = asyncio.ensure_future(_call_model_async(hedge, prompt, promote=False))
+                pending.add(hedge_task)
+        while pending and paragraph is None:
+            done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+            for task in done:
+                if task.result() is not None:
+                    paragraph, winner = task.result(), task
+                    break
+    finally:
+        for task in pending:
+            task.cancel()  # the loser, or both if this request was cancelled
+        HEDGING.record_request(time.perf_counter() - started, delay, hedged=hedge is not None,
+                               hedge_won=winner is not None and winner is hedge_task)
+    return paragraph
+
+async def request_gemini_paragraph_async(birth_chart: str, disc: str):
+    """Async counterpart of request_gemini_paragraph(). Returns None if no model answered."""
+    prompt = build_gemini_prompt(birth_chart, disc)
+    cost = estimate_call_tokens(prompt)
+    breakers = MODEL_REGISTRY.healthy()
+    for breaker in breakers:
+        if not await RATE_LIMITER.acquire_async(cost):
+            breaker.release()
+            print("🚦 Gemini rate budget exhausted, using fallback")
+            return None
+        paragraph = await _call_with_hedge_async(breaker, breakers, prompt, cost)
+        if paragraph is not None:
+            return paragraph
+
+    print("⚠️  No healthy Gemini model answered, using fallback")
+    return None
+
+def _call_model(breaker, prompt: str, promote: bool = True, cancelled=None):
+    """
+    One complete (non-streamed to the caller) call to a model. Returns the paragraph or None.
+    Setting the `cancelled` event abandons the call at the next chunk and closes its stream;
+    an abandoned call is neither a success nor a failure, so a half-open trial is handed back.
+    """
+    if cancelled is not None and cancelled.is_set():
+        breaker.release()  # lost before a pool worker even picked it up
+        return None
+    started = time.perf_counter()
+    paragraph = ''
+    events = _stream_from_model(breaker, prompt)
+    try:
+        for kind, value in events:
+            if cancelled is not None and cancelled.is_set():
+                breaker.release()
+                return None
+            if kind == 'final':
+                paragraph = value
+    except Exception as e:
+        if cancelled is not None and cancelled.is_set():
+            breaker.release()
+        else:
+            _model_call_failed(breaker, started, e)
+        return None
+    finally:
+        events.close()
+    if not _model_call_finished(breaker, started, paragraph, promote):
+        return None
+    return paragraph
+
+def _next_hedge(breakers, cost: float):
+    """Take the next healthy model for a hedge if the hedge and rate budgets allow, else None."""
+    if not HEDGING.reserve():
+        return None
+    hedge = next(breakers, None)
+    if hedge is None:
+        HEDGING.release()
+        return None
+    # Hedges never queue for rate budget: a late hedge is no hedge
+    if not RATE_LIMITER.acquire(cost, 0):
+        hedge.release()
+        HEDGING.release()
+        return None
+    return hedge
+
+def _call_with_hedge(primary, breakers, prompt: str, cost: float):
+    """Call `primary`, hedging to the next model from `breakers` if it runs past its p90."""
+    delay, held_out = HEDGING.delay_for(primary)
+    started = time.perf_counter()
+    if delay is None:
+        paragraph = _call_model(primary, prompt)
+        HEDGING.record_request(time.perf_counter() - started, held_out=held_out)
+        return paragraph
+
+    cancel = threading.Event()
+    hedge_cancel = threading.Event()
+    calls = {HEDGE_POOL.submit(_call_model, primary, prompt, True, cancel): cancel}
+    done, _ = wait_futures(calls, timeout=delay)
+    hedge = None
+    if not done:
+        hedge = _next_hedge(breakers, cost)
+        if hedge is not None:
+            print(f"🪁 {primary.name} slower than its p90 ({delay:.2f}s), hedging to {hedge.name}")
+            hedge_future = HEDGE_POOL.submit(_call_model, hedge, prompt, False, hedge_cancel)
+            calls[hedge_future] = hedge_cancel
+
+    paragraph = winner = None
+    pending = set(calls)
+    while pending and paragraph is None:
+        done, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.result() is not None:
+                paragraph, winner = future.result(), calls[future]
+                break
+    for future in pending:
+        calls[future].set()  # the loser
+    HEDGING.record_request(time.perf_counter() - started, delay, hedged=hedge is not None,
+                           hedge_won=winner is hedge_cancel)
+    return paragraph
+
+def request_gemini_paragraph(birth_chart: str, disc: str, rate_wait=None):
+    """
+    Ask Gemini for a paragraph, bypassing every cache. Returns None if no model answered.
+    Unlike the streaming path, a slow primary model may be hedged (see HedgePolicy).
+    """
+    prompt = build_gemini_prompt(birth_chart, disc)
+    cost = estimate_call_tokens(prompt)
+    breakers = MODEL_REGISTRY.healthy()
+    for breaker in breakers:
+        if not RATE_LIMITER.acquire(cost, rate_wait):
+            breaker.release()
+            print("🚦 Gemini rate budget exhausted, using fallback")
+            return None
+        paragraph = _call_with_hedge(breaker, breakers, prompt, cost)
+        if paragraph is not None:
+            return paragraph
+
+    print("⚠️  No healthy Gemini model answered, using fallback")
+    return None
+
+def fetch_into_cache(key: str, birth_chart: str, disc: str, rate_wait=None):
+    """Ask Gemini for a fresh paragraph and cache it under key. Returns None if no model answered."""
+    fresh = request_gemini_paragraph(birth_chart, disc, rate_wait)
+    if fresh is not None:
+        remember_report(key, birth_chart, disc, fresh)
+    return fresh
+
+def generate_career_paragraph(birth_chart: str, disc: str, deadline=None, lookup: bool = True,
+                              rate_wait=None) -> tuple[str, str]:
+    """
+    Return (paragraph, source) for the inputs, where source is 'cache', 'store' (the persistent
+    report store), 'table' (the precomputed report table), 'Gemini API' or 'Fallback Generator'.
+    Only Gemini output is cached; the fallback is cheap and caching it would hide Gemini once
+    discovery finishes.
+
+    `deadline` (see request_deadline()) bounds the wait for Gemini: once it passes the fallback
+    is returned and the Gemini call finishes in the background, filling the cache.
+    `lookup=False` skips the cache/store/table lookup for callers that just did it (batches).
+    `rate_wait` lets offline callers queue for rate budget (see RateLimiter.acquire); they also wait
+    that much longer for the shared call.
+    """
+    key = report_cache_key(birth_chart, disc)
+    found = lookup_report(key, birth_chart, disc) if lookup else None
+    if found is not None:
+        return found
+
+    if GEMINI_AVAILABLE:
+        # Identical requests arriving while this one is in flight wait for its answer
+        future, started_at = SINGLE_FLIGHT.start(
+            key, lambda: fetch_into_cache(key, birth_chart, disc, rate_wait), GEMINI_BACKGROUND
+        )
+        try:
+            paragraph = SINGLE_FLIGHT.wait(future, started_at, deadline, extra=rate_wait or 0)
+        except FutureTimeoutError:
+            if _deadline_passed(deadline):
+                _record_deadline_fallback(future)
+            else:
+                print("⏳ Timed out waiting for an identical in-flight Gemini request, using fallback")
+            paragraph = None
+        except Exception as e:
+            print(f"⚠️  Shared Gemini request failed: {e}, using fallback")
+            paragraph = None
+        if paragraph is not None:
+            return paragraph, 'Gemini API'
+
+    return generate_fallback_paragraph(birth_chart, disc), 'Fallback Generator'
+
+async def generate_career_paragraph_async(birth_chart: str, disc: str, deadline=None,
+                                          lookup: bool = True) -> tuple[str, str]:
+    """Async counterpart of generate_career_paragraph(); never blocks the event loop on Gemini."""
+    key = report_cache_key(birth_chart, disc)
+    found = lookup_report(key, birth_chart, disc) if lookup else None
+    if found is not None:
+        return found
+
+    if GEMINI_AVAILABLE:
+        async def fetch():
+            fresh = await request_gemini_paragraph_async(birth_chart, disc)
+            if fresh is not None:
+                remember_report(key, birth_chart, disc, fresh)
+            return fresh
+
+        future, started_at = SINGLE_FLIGHT.start_async(key, fetch)
+        try:
+            paragraph = await SINGLE_FLIGHT.wait_async(future, started_at, deadline)
+        except FutureTimeoutError:
+            if _deadline_passed(deadline):
+                _record_deadline_fallback(future)
+            else:
+                print("⏳ Timed out waiting for an identical in-flight Gemini request, using fallback")
+            paragraph = None
+        except Exception as e:
+            print(f"⚠️  Shared Gemini request failed: {e}, using fallback")
+            paragraph = None
+        if paragraph is not None:
+            return paragraph, 'Gemini API'
+
+    return generate_fallback_paragraph(birth_chart, disc), 'Fallback Generator'
 
 # =====================
-# Configuration / Data
+# Batch generation
 # =====================
-BIRTH_CHART = "Sun in Libra, Ascendant in Capricorn"
-DISC_PROFILE = "High C, low I"
-DEFAULT_PROMPT = (
-    "Synthesize a career recommendation based on a person with a birth chart indicating 'Sun in Libra, "
-    "Ascendant in Capricorn' and a DISC profile of 'High C, low I.' The final output should be a single paragraph "
-    "written in a friendly, conversational tone, suitable for a personalized report. The key themes to explore "
-    "are balancing an innate desire for harmony with a disciplined work ethic, and leveraging a detail-oriented "
-    "nature in a role that values structure."
-)
+def _plan_batch(profiles: list):
+    """
+    Validate and deduplicate a batch. Returns (results, pending) where results holds one
+    dict per profile (already filled for errors and cache/table hits) and pending maps each
+    uncached normalized key to (birth, disc, [indexes that share it]).
+    """
+    results = [None] * len(profiles)
+    pending = {}
+    for index, profile in enumerate(profiles):
+        if not isinstance(profile, dict):
+            results[index] = {'error': 'Each profile must be an object with "birth" and "disc".'}
+            continue
+        birth = profile.get('birth', BIRTH_CHART)
+        disc = profile.get('disc', DISC_PROFILE)
+        # Same checks as /generate: a null or oversized field is an error, not a chart
+        error = profile_error_payload(birth, disc)
+        if error is not None:
+            results[index] = error
+            continue
+        key = report_cache_key(birth, disc)
+        if key in pending:
+            pending[key][2].append(index)
+            continue
+        started = time.perf_counter()
+        found = lookup_report(key, birth, disc)
+        if found is not None:
+            results[index] = {
+                'paragraph': found[0], 'source': found[1],
+                'latency_ms': round((time.perf_counter() - started) * 1000, 3),
+            }
+            # Later duplicates of a stored key are served from the cache or table as well
+            continue
+        pending[key] = (birth, disc, [index])
+    return results, pending
 
-# Gemini API Configuration
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        
-        # Function to list available models
-        def list_available_models():
+def _fill_batch(results: list, indexes: list, paragraph: str, source: str, latency: float) -> None:
+    for position, index in enumerate(indexes):
+        results[index] = {
+            'paragraph': paragraph,
+            'source': source,
+            'latency_ms': round(latency * 1000, 3),
+        }
+        if position:
+            results[index]['deduplicated'] = True
+
+def _batch_item_too_late(birth: str, disc: str, deadline):
+    """
+    Fallback (paragraph, source) for a queued batch item whose turn comes after `deadline`,
+    else None. Nobody would wait for a Gemini call started that late.
+    """
+    if not _deadline_passed(deadline):
+        return None
+    _record_deadline_fallback()
+    return generate_fallback_paragraph(birth, disc), 'Fallback Generator'
+
+def generate_batch(profiles: list, concurrency: int = None, deadline=None) -> list:
+    """
+    Generate paragraphs for many {birth, disc} profiles. Duplicates are generated once,
+    cache hits return immediately, and misses run with at most `concurrency` parallel calls.
+    Results come back in input order with per-item source and latency. Items still waiting
+    on Gemini at `deadline` get the fallback, and items not started by then never call Gemini.
+    """
+    results, pending = _plan_batch(profiles)
+    if not pending:
+        return results
+
+    def run(birth, disc):
+        started = time.perf_counter()
+        # _plan_batch already looked every pending key up
+        paragraph, source = (_batch_item_too_late(birth, disc, deadline)
+                             or generate_career_paragraph(birth, disc, deadline, lookup=False))
+        return paragraph, source, time.perf_counter() - started
+
+    workers = max(1, min(concurrency or BATCH_CONCURRENCY, len(pending)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as executor:
+        futures = {executor.submit(run, birth, disc): indexes for birth, disc, indexes in pending.values()}
+        for future, indexes in futures.items():
             try:
-                models = genai.list_models()
-                print("📋 Available Gemini models:")
-                for model in models:
-                    if 'generateContent' in model.supported_generation_methods:
-                        print(f"  ✅ {model.name} - Supports generateContent")
-                    else:
-                        print(f"  ❌ {model.name} - No generateContent support")
-                return models
+                _fill_batch(results, indexes, *future.result())
             except Exception as e:
-                print(f"⚠️  Could not list models: {e}")
-                return []
-        
-        # Function to test API connection
-        def test_api_connection():
+                print(f"❌ Error generating batch item: {e}")
+                for index in indexes:
+                    results[index] = {'error': 'Failed to generate paragraph.'}
+    return results
+
+async def generate_batch_async(profiles: list, concurrency: int = None, deadline=None) -> list:
+    """Async counterpart of generate_batch(), bounded by a semaphore instead of a thread pool."""
+    results, pending = _plan_batch(profiles)
+    semaphore = asyncio.Semaphore(max(1, concurrency or BATCH_CONCURRENCY))
+
+    async def run(birth, disc, indexes):
+        async with semaphore:
+            started = time.perf_counter()
             try:
-                print("🔍 Testing API connection...")
-                # Try to list models first
-                models = list(genai.list_models())  # Convert generator to list
-                print(f"✅ API connection successful. Found {len(models)} models.")
-                return True
+                paragraph, source = (_batch_item_too_late(birth, disc, deadline)
+                                     or await generate_career_paragraph_async(birth, disc, deadline, lookup=False))
             except Exception as e:
-                print(f"❌ API connection failed: {e}")
-                print(f"💡 Error type: {type(e).__name__}")
-                if "404" in str(e):
-                    print("💡 404 error suggests model not found or API version mismatch")
-                elif "403" in str(e):
-                    print("💡 403 error suggests API key permission issues")
-                elif "401" in str(e):
-                    print("💡 401 error suggests invalid API key")
-                return False
-        
-        # Test API connection first
-        if not test_api_connection():
-            print("❌ Cannot proceed with model testing due to API connection issues")
-            GEMINI_AVAILABLE = False
-        else:
-            # List available models first
-            available_models_list = list_available_models()
-            
-            # Try different model names - updated for current API version
-            # The API has changed and these are the current model names
-            available_models = [
-                'gemini-1.5-pro-latest',  # Latest stable version
-                'gemini-1.5-pro-002',     # Stable version from September 2024
-                'gemini-1.5-pro',         # Stable version from May 2024
-                'gemini-1.5-flash-latest', # Latest flash version
-                'gemini-1.5-flash-002',   # Stable flash version
-                'gemini-1.5-flash',       # Flash alias
-                'gemini-2.0-flash',       # Newer 2.0 version
-                'gemini-2.0-flash-001'    # Stable 2.0 version
-            ]
-            GEMINI_MODEL = None
-            
-            for model_name in available_models:
-                try:
-                    print(f"🔍 Testing model: {model_name}")
-                    GEMINI_MODEL = genai.GenerativeModel(model_name)
-                    # Test the model with a simple prompt
-                    response = GEMINI_MODEL.generate_content("Hello")
-                    if response and response.text:
-                        print(f"✅ Gemini API configured successfully with model: {model_name}")
-                        break
-                    else:
-                        print(f"⚠️  Model {model_name} returned empty response")
-                except Exception as model_error:
-                    print(f"⚠️  Model {model_name} failed: {model_error}")
-                    continue
-            
-            if GEMINI_MODEL:
-                GEMINI_AVAILABLE = True
-                print(f"🎯 Using Gemini model: {GEMINI_MODEL.model_name}")
-            else:
-                print("❌ No working Gemini model found")
-                print("💡 This might be due to:")
-                print("   - API key permissions")
-                print("   - Model availability in your region")
-                print("   - API version compatibility")
-                GEMINI_AVAILABLE = False
-                
-    except Exception as e:
-        print(f"⚠️  Gemini API configuration failed: {e}")
-        print(f"💡 Error details: {type(e).__name__}")
-        GEMINI_AVAILABLE = False
-else:
-    GEMINI_AVAILABLE = False
-    print("⚠️  No GEMINI_API_KEY found in environment variables. Using fallback generator.")
+                print(f"❌ Error generating batch item: {e}")
+                for index in indexes:
+                    results[index] = {'error': 'Failed to generate paragraph.'}
+                return
+            _fill_batch(results, indexes, paragraph, source, time.perf_counter() - started)
 
-# =====================
-# Utility: Fallback generator
-# =====================
-def generate_fallback_paragraph(birth_chart: str, disc: str) -> str:
+    await asyncio.gather(*(run(birth, disc, indexes) for birth, disc, indexes in pending.values()))
+    return results
+
+def batch_request_error(data):
+    """Validate a /generate/batch body. Returns (error body or None, profiles, concurrency)."""
+    profiles = data.get('profiles') if isinstance(data, dict) else None
+    if not isinstance(profiles, list) or not profiles:
+        return {'error': 'Expected a JSON body like {"profiles": [{"birth": ..., "disc": ...}]}.'}, None, None
+    if len(profiles) > BATCH_MAX_PROFILES:
+        return {'error': f'At most {BATCH_MAX_PROFILES} profiles per batch.'}, None, None
+    concurrency = data.get('concurrency')
+    if concurrency is not None:
+        # bool is an int subclass, but "concurrency": true is not a number
+        if isinstance(concurrency, bool) or not isinstance(concurrency, int) or concurrency < 1:
+            return {'error': '"concurrency" must be a positive integer.'}, None, None
+        concurrency = min(concurrency, BATCH_CONCURRENCY)
+    return None, profiles, concurrency
+
+def stream_career_paragraph(birth_chart: str, disc: str, deadline=None):
     """
-    Rule-based paragraph generator that synthesizes the two data points into a friendly paragraph.
-    This allows the app to work offline and satisfies the "single paragraph" output requirement.
+    Streaming counterpart of generate_career_paragraph(). Yields (event, payload) pairs:
+    'chunk' {'text'} as text arrives, 'reset' {} if a model fails mid-stream (or the deadline
+    passes) and the text shown so far must be discarded, and finally 'done' {'paragraph', 'source'}.
     """
-    # Break down features to craft an empathetic, professional-sounding paragraph.
-    # We keep it concise and single-paragraph as required by the assessment.
-    parts = []
+    key = report_cache_key(birth_chart, disc)
+    found = lookup_report(key, birth_chart, disc)
+    if found is not None:
+        yield 'chunk', {'text': found[0]}
+        yield 'done', {'paragraph': found[0], 'source': found[1]}
+        return
 
-    parts.append("With Sun in Libra, you naturally value fairness, relationships, and balance, and with an Ascendant in Capricorn, you bring a steady, disciplined approach to how you present yourself at work.")
-    parts.append("Your DISC profile — high Conscientiousness and low Influence — suggests you thrive in roles that reward precision, structure, and deep thinking rather than constant social selling or networking.")
-    parts.append("A fulfilling career path for you could be in areas like project coordination, compliance, technical writing, data analysis, or quality assurance — roles where a methodological mindset and an eye for detail are prized.")
-    parts.append("To maximize satisfaction, look for positions that allow collaborative harmony (so your Libra strengths are honored) but offer clear frameworks, measurable goals, and opportunities to work independently on structured tasks that showcase your reliability.")
+    if GEMINI_AVAILABLE:
+        # Gemini is read on a background thread so the deadline can cut the wait short while the
+        # call itself runs to completion and fills the cache. Identical streams share that call
+        # and replay its chunks.
+        def events():
+            for event, value in _gemini_events(birth_chart, disc):
+                if event == 'done' and value is not None:
+                    remember_report(key, birth_chart, disc, value)
+                yield event, value
 
-    paragraph = " ".join(parts)
-    # Ensure single paragraph and reasonable length
-    paragraph = textwrap.fill(paragraph, width=100)
-    return paragraph
+        future, started_at, log = SINGLE_FLIGHT.start_stream(key, events, GEMINI_BACKGROUND)
+        paragraph = None
+        shown = False
+        try:
+            if log is not None:
+                for event, value in SINGLE_FLIGHT.follow(log, started_at, deadline):
+                    shown = event == 'chunk'
+                    yield event, ({'text': value} if shown else {})
+            paragraph = SINGLE_FLIGHT.wait(future, started_at, deadline)
+        except FutureTimeoutError:
+            if _deadline_passed(deadline):
+                _record_deadline_fallback(future)
+            else:
+                print("⏳ Timed out waiting for an identical in-flight Gemini request, using fallback")
+        except Exception as e:
+            print(f"⚠️  Gemini stream failed: {e}")
+        if paragraph is not None:
+            if log is None:
+                yield 'chunk', {'text': paragraph}  # joined a non-streaming call: no chunks to replay
+            yield 'done', {'paragraph': paragraph, 'source': 'Gemini API'}
+            return
+        if shown:
+            yield 'reset', {}
+
+    paragraph = generate_fallback_paragraph(birth_chart, disc)
+    yield 'chunk', {'text': paragraph}
+    yield 'done', {'paragraph': paragraph, 'source': 'Fallback Generator'}
 
-# =====================
-# Gemini API Integration
-# =====================
 def generate_gemini_paragraph(birth_chart: str, disc: str) -> str:
     """
     Generate career recommendation using Gemini API.
     Returns a single paragraph as requested in the assessment.
     """
-    if not GEMINI_AVAILABLE:
-        return generate_fallback_paragraph(birth_chart, disc)
-    
-    try:
-        # Construct the prompt as specified in the assessment
-        prompt = f"""Synthesize a career recommendation based on a person with a birth chart indicating '{birth_chart}' and a DISC profile of '{disc}'. 
-
-The final output should be a single paragraph written in a friendly, conversational tone, suitable for a personalized report. 
-
-Key themes to explore:
-- Balancing an innate desire for harmony with a disciplined work ethic
-- Leveraging a detail-oriented nature in a role that values structure
-- Finding career paths that align with both astrological and personality traits
-
-Please provide exactly one well-structured paragraph that synthesizes these insights into actionable career advice."""
-
-        # Generate response using Gemini
-        response = GEMINI_MODEL.generate_content(prompt)
-        
-        if response and response.text:
-            # Clean and format the response
-            paragraph = response.text.strip()
-            
-            # Ensure it's a single paragraph (remove extra line breaks)
-            paragraph = ' '.join(paragraph.split())
-            
-            # If response is too long, truncate to reasonable length
-            if len(paragraph) > 500:
-                sentences = paragraph.split('. ')
-                paragraph = '. '.join(sentences[:3]) + '.'
-            
-            return paragraph
-        else:
-            print("⚠️  Gemini API returned empty response, using fallback")
-            return generate_fallback_paragraph(birth_chart, disc)
-            
-    except Exception as e:
-        print(f"⚠️  Gemini API error: {e}, using fallback")
-        return generate_fallback_paragraph(birth_chart, disc)
+    return generate_career_paragraph(birth_chart, disc)[0]
 
 
 BASE_HTML = """
@@ -200,9 +2665,15 @@ BASE_HTML = """
     <meta charset="utf-8" />
     <meta name="viewport" content="width=device-width, initial-scale=1" />
     <title>AstroDISC™ Lite — Career Snapshot</title>
+    {% if assets %}
+    {% for font in assets.preload %}
+    <link rel="preload" href="/assets/{{ font }}" as="font" type="font/woff2" crossorigin>
+    {% endfor %}
+    {% else %}
     <script src="https://cdn.tailwindcss.com"></script>
     <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
+    {% endif %}
     <style>
       * {
         font-family: 'Inter', sans-serif;
@@ -379,6 +2850,10 @@ BASE_HTML = """
         .input-grid { grid-template-columns: 1fr; }
       }
     </style>
+    {% if assets %}
+    {# After the page styles, where the Tailwind CDN script injects its output, so the cascade is unchanged #}
+    <link href="/assets/{{ assets.css }}" rel="stylesheet">
+    {% endif %}
   </head>
   <body class="min-h-screen flex items-center justify-center p-4">
     <div class="fixed inset-0 bg-gradient-to-br from-purple-900/20 to-blue-900/20 pointer-events-none"></div>
@@ -552,6 +3027,10 @@ BASE_HTML = """
             apiStatusEl.innerHTML = '<i class="fas fa-circle text-orange-500"></i><span class="text-orange-700">Fallback Generator</span>';
             apiStatusEl.className = 'mt-4 inline-flex items-center gap-2 px-4 py-2 rounded-full text-sm font-medium bg-orange-100 text-orange-700';
           }
+          // Model discovery runs in the background; keep polling until it settles
+          if (!data.ready) {
+            setTimeout(checkApiStatus, 3000);
+          }
         } catch (e) {
           apiStatusEl.innerHTML = '<i class="fas fa-circle text-gray-500"></i><span class="text-gray-700">Status Unknown</span>';
           apiStatusEl.className = 'mt-4 inline-flex items-center gap-2 px-4 py-2 rounded-full text-sm font-medium bg-gray-100 text-gray-700';
@@ -576,6 +3055,30 @@ BASE_HTML = """
         }
       }
 
+      // Minimal Server-Sent Events reader for a fetch() response body
+      async function readEventStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          let boundary;
+          while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            let event = 'message';
+            let data = '';
+            frame.split('\n').forEach(line => {
+              if (line.startsWith('event: ')) event = line.slice(7);
+              else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+            if (data) onEvent(event, JSON.parse(data));
+          }
+        }
+      }
+      
       async function generate() {
         // Update button state
         generateBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Generating...';
@@ -602,15 +3105,14 @@ BASE_HTML = """
         console.log('Sending payload:', payload);
         
         try {
-          const r = await fetch('/generate', {
+          // Stream the paragraph so text appears as soon as the first tokens arrive
+          const r = await fetch('/generate/stream', {
             method: 'POST', 
             headers: { 'Content-Type': 'application/json' }, 
             body: JSON.stringify(payload)
           })
           
-          const data = await r.json()
-          
-          if (r.ok) {
+          if (r.ok && r.body) {
             // Success animation
             resultEl.classList.remove('loading');
             resultEl.classList.add('success-animation');
@@ -622,8 +3124,8 @@ BASE_HTML = """
                     <i class="fas fa-check-circle text-xl"></i>
                     <span class="font-medium">Career Recommendation Generated!</span>
                   </div>
-                  <div class="text-xs px-2 py-1 rounded-full ${data.source === 'Gemini API' ? 'bg-blue-100 text-blue-700' : 'bg-orange-100 text-orange-700'}">
-                    ${data.source}
+                  <div id="resultSource" class="text-xs px-2 py-1 rounded-full bg-gray-100 text-gray-600">
+                    Generating...
                   </div>
                 </div>
                 
@@ -636,12 +3138,28 @@ BASE_HTML = """
                   </div>
                 </div>
                 
-                <div class="text-gray-700 leading-relaxed">
-                  ${data.paragraph}
-                </div>
+                <div id="resultParagraph" class="text-gray-700 leading-relaxed"></div>
               </div>
             `;
+            
+            const paragraphEl = document.getElementById('resultParagraph');
+            const sourceEl = document.getElementById('resultSource');
+            await readEventStream(r, (event, data) => {
+              if (event === 'chunk') {
+                paragraphEl.textContent += data.text;
+              } else if (event === 'reset') {
+                paragraphEl.textContent = '';
+              } else if (event === 'done') {
+                paragraphEl.textContent = data.paragraph;
+                sourceEl.textContent = data.source;
+                sourceEl.className = `text-xs px-2 py-1 rounded-full ${data.source !== 'Fallback Generator' ? 'bg-blue-100 text-blue-700' : 'bg-orange-100 text-orange-700'}`;
+              } else if (event === 'error') {
+                paragraphEl.textContent = data.error;
+                paragraphEl.className = 'text-red-600';
+              }
+            });
           } else {
+            const data = await r.json()
             resultEl.innerHTML = `
               <div class="text-center text-red-600">
                 <i class="fas fa-exclamation-triangle text-2xl mb-2"></i>
@@ -806,63 +3324,541 @@ BASE_HTML = """
 </html>
 """
 
+# =====================
+# Response compression
+# =====================
+COMPRESSIBLE_MIMETYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+# Polled routes that get a content ETag, so unchanged bodies revalidate with an empty 304
+CONDITIONAL_PATHS = frozenset(('/', '/api-status', '/models'))
+_ETAG_SUFFIXES = {'identity': '', 'gzip': '-gz', 'br': '-br'}
+
+def negotiate_encoding(accept_encoding: str, mimetype, size: int) -> str:
+    """Best encoding for a body: 'br', 'gzip' or 'identity' when small, incompressible or not accepted."""
+    if size < COMPRESS_MIN_SIZE or not mimetype or not mimetype.startswith(COMPRESSIBLE_MIMETYPES):
+        return 'identity'
+    offered = ('br', 'gzip') if brotli is not None else ('gzip',)
+    return parse_accept_header(accept_encoding).best_match(offered) or 'identity'
+
+def compress_body(body: bytes, encoding: str, static: bool = False) -> bytes:
+    """Compress with fast settings for per-request bodies and maximum ratio for cached static ones."""
+    if encoding == 'br':
+        return brotli.compress(body, quality=11 if static else 5)
+    return gzip.compress(body, compresslevel=9 if static else 6, mtime=0)
+
+def content_etag(body: bytes, encoding: str) -> str:
+    """Strong ETag for a body; each encoding gets its own so caches never mix representations."""
+    return hashlib.sha256(body).hexdigest()[:32] + _ETAG_SUFFIXES[encoding]
+
+class CompressedBodyCache:
+    """Thread-safe LRU of compressed bodies keyed on (validator, encoding)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, encoding: str, load_body) -> bytes:
+        """Return the compressed body, reading and compressing it with load_body() on a miss."""
+        with self._lock:
+            body = self._entries.get((key, encoding))
+            if body is not None:
+                self._entries.move_to_end((key, encoding))
+                self.hits += 1
+                return body
+            self.misses += 1
+        # Compress outside the lock; a concurrent miss just does the same work twice
+        body = compress_body(load_body(), encoding, static=True)
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[(key, encoding)] = body
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return body
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+COMPRESSED_BODIES = CompressedBodyCache(COMPRESS_CACHE_SIZE)
+
+@app.after_request
+def compress_response(response):
+    """
+    Compress every eligible response for the client's Accept-Encoding and answer revalidations.
+
+    Static files are compressed once and served from COMPRESSED_BODIES; CONDITIONAL_PATHS get a content
+    ETag. Streams (SSE), error responses and bodies that are already encoded (the index page) pass through.
+    """
+    if (response.status_code != 200 or 'Content-Encoding' in response.headers
+            or (response.is_streamed and not response.direct_passthrough)):
+        return response
+    if not response.mimetype or not response.mimetype.startswith(COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    accept_encoding = request.headers.get('Accept-Encoding', '')
+
+    if response.direct_passthrough:
+        # send_from_directory: file bodies with an mtime/size ETag that identifies the file version
+        static_etag, _ = response.get_etag()
+        encoding = negotiate_encoding(accept_encoding, response.mimetype, response.content_length or 0)
+        if encoding == 'identity' or not static_etag:
+            return response
+        response.direct_passthrough = False
+        body = COMPRESSED_BODIES.get(static_etag, encoding, response.get_data)
+        response.close()  # a no-op once get_data() has read the file
+        response.set_data(body)
+        response.headers.pop('Accept-Ranges', None)  # ranges would apply to the compressed bytes
+        response.headers['Content-Encoding'] = encoding
+        response.set_etag(static_etag + _ETAG_SUFFIXES[encoding])
+        return response.make_conditional(request)
+
+    body = response.get_data()
+    encoding = negotiate_encoding(accept_encoding, response.mimetype, len(body))
+    conditional = request.method in ('GET', 'HEAD') and request.path in CONDITIONAL_PATHS
+    if conditional and not response.get_etag()[0]:
+        response.set_etag(content_etag(body, encoding))
+        if request.if_none_match.contains_weak(response.get_etag()[0]):
+            return response.make_conditional(request)  # unchanged: skip compressing a body that is never sent
+    if encoding != 'identity':
+        response.set_data(compress_body(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response.make_conditional(request) if conditional else response
+
+def compression_stats() -> dict:
+    return {
+        'min_size': COMPRESS_MIN_SIZE,
+        'encodings': ['br', 'gzip'] if brotli is not None else ['gzip'],
+        'static_cache': COMPRESSED_BODIES.stats(),
+    }
+
+# =====================
+# Static assets
+# =====================
+# Built by build_assets.py: purged Tailwind CSS, subset icon font and self-hosted Inter.
+# Without a manifest the page falls back to the CDNs.
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'dist')
+ASSET_MAX_AGE = 365 * 24 * 60 * 60
+
+def load_asset_manifest():
+    """Return the build manifest ({'css', 'preload', 'files'}), or None if assets were not built."""
+    try:
+        with open(os.path.join(ASSET_DIR, 'manifest.json'), encoding='utf-8') as fh:
+            manifest = json.load(fh)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable asset manifest: {e}")
+        return None
+    missing = [name for name in manifest.get('files', []) if not os.path.exists(os.path.join(ASSET_DIR, name))]
+    if missing:
+        print(f"⚠️  Asset manifest lists missing files ({', '.join(missing)}), using CDN assets")
+        return None
+    return manifest
+
+ASSET_MANIFEST = load_asset_manifest()
+_ASSET_FILES = frozenset(ASSET_MANIFEST['files']) if ASSET_MANIFEST else frozenset()
+
+@app.route('/assets/<path:filename>')
+def assets(filename):
+    # Only fingerprinted build outputs are served, so they can be cached forever
+    if filename not in _ASSET_FILES:
+        abort(404)
+    response = send_from_directory(ASSET_DIR, filename, max_age=ASSET_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+# =====================
+# Pre-rendered index page
+# =====================
+class PrerenderedPage:
+    """
+    A page rendered once and kept in memory with gzip and (if available) brotli variants.
+    Each variant has its own strong ETag derived from the rendered bytes.
+    """
+
+    def __init__(self, body: bytes, mimetype: str = 'text/html'):
+        self.mimetype = mimetype
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {'identity': (body, digest)}
+        self.variants['gzip'] = (gzip.compress(body, compresslevel=9, mtime=0), f"{digest}-gz")
+        if brotli is not None:
+            self.variants['br'] = (brotli.compress(body, quality=11), f"{digest}-br")
+
+    def response(self):
+        """Response for the current request: best accepted encoding, 304 on a matching If-None-Match."""
+        encoding = request.accept_encodings.best_match(
+            [e for e in ('br', 'gzip') if e in self.variants]
+        ) or 'identity'
+        body, etag = self.variants[encoding]
+        response = Response(body, mimetype=self.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'no-cache'  # always revalidate; a 304 costs no body
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+# The page only depends on the defaults, so it is compiled and rendered exactly once
+INDEX_TEMPLATE = app.jinja_env.from_string(BASE_HTML)
+INDEX_PAGE = PrerenderedPage(
+    INDEX_TEMPLATE.render(birth_chart=BIRTH_CHART, disc_profile=DISC_PROFILE, assets=ASSET_MANIFEST).encode('utf-8')
+)
+
+# Kick off model discovery now that every helper it may touch is defined
+start_model_discovery()
+
 @app.route('/')
 def index():
-    # Render page with defaults
-    return render_template_string(BASE_HTML, birth_chart=BIRTH_CHART, disc_profile=DISC_PROFILE)
+    # Served from memory
+    return INDEX_PAGE.response()
+
+def api_status_payload() -> dict:
+    """
+    Status document shared by the Flask and ASGI /api-status routes.
+    Only changes when the status does, so its ETag holds under traffic; counters are in /metrics.
+    """
+    status = discovery_status()
+    model = GEMINI_MODEL
+    return {
+        'available': GEMINI_AVAILABLE,
+        'source': 'Gemini API' if GEMINI_AVAILABLE else 'Fallback Generator',
+        'ready': status['ready'],
+        'discovery': status['state'],
+        'model': model.model_name if model is not None else None,
+        'probes': status['probes'],
+        'models': MODEL_REGISTRY.states(),
+    }
+
+def metrics_payload() -> dict:
+    """Per-request counters shared by the Flask and ASGI /metrics routes."""
+    return {
+        'models': MODEL_REGISTRY.snapshot(),
+        'cache': RESPONSE_CACHE.stats(),
+        'report_store': REPORT_STORE.stats(),
+        'report_table': REPORT_TABLE.stats(),
+        'single_flight': SINGLE_FLIGHT.stats(),
+        'rate_limit': RATE_LIMITER.stats(),
+        'deadline': dict(DEADLINE_STATS),
+        'hedging': HEDGING.stats(),
+        'model_catalogue': MODEL_CATALOGUE.stats(),
+        'early_stop': dict(EARLY_STOP_STATS),
+        'compression': compression_stats(),
+    }
+
+# Counters change with every request; there is nothing for a client to revalidate
+METRICS_HEADERS = {'Cache-Control': 'no-store'}
+
+def list_models_payload() -> tuple[dict, int, dict]:
+    """Return (body, status code, headers) for /models, served from MODEL_CATALOGUE."""
+    if not GEMINI_AVAILABLE:
+        return {'error': 'Gemini API not configured'}, 400, {}
+
+    models, fetched_at = MODEL_CATALOGUE.get()
+    if models is None:
+        # Discovery found a model without a listing (cannot normally happen); list once, synchronously
+        if not MODEL_CATALOGUE.refresh():
+            return {'error': MODEL_CATALOGUE.last_error}, 500, {}
+        models, fetched_at = MODEL_CATALOGUE.get()
+
+    available_models = [
+        {
+            'name': model['name'],
+            'description': model.get('description') or 'No description',
+            'supported_methods': model['supported_generation_methods'],
+        }
+        for model in models
+        if 'generateContent' in model['supported_generation_methods']
+    ]
+    # Browsers may reuse the list until the catalogue itself is due for a refresh
+    max_age = max(0, int(MODEL_CATALOGUE.ttl - (time.time() - fetched_at)))
+    headers = {
+        'Cache-Control': f'private, max-age={max_age}',
+        'Last-Modified': formatdate(fetched_at, usegmt=True),
+    }
+    return {'models': available_models, 'fetched_at': fetched_at}, 200, headers
 
 @app.route('/api-status')
 def api_status():
     """Return the current API availability status"""
-    return jsonify({
-        'available': GEMINI_AVAILABLE,
-        'source': 'Gemini API' if GEMINI_AVAILABLE else 'Fallback Generator'
-    })
+    return jsonify(api_status_payload())
+
+@app.route('/metrics')
+def metrics():
+    """Return cache, breaker, rate-limit and other counters"""
+    return jsonify(metrics_payload()), 200, METRICS_HEADERS
 
 @app.route('/models')
 def list_models():
     """List available Gemini models"""
-    if not GEMINI_AVAILABLE:
-        return jsonify({'error': 'Gemini API not configured'}), 400
-    
-    try:
-        models = genai.list_models()
-        available_models = []
-        for model in models:
-            if 'generateContent' in model.supported_generation_methods:
-                available_models.append({
-                    'name': model.name,
-                    'description': getattr(model, 'description', 'No description'),
-                    'supported_methods': model.supported_generation_methods
-                })
-        return jsonify({'models': available_models})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    body, status_code, headers = list_models_payload()
+    return jsonify(body), status_code, headers
+
+# =====================
+# Health checks
+# =====================
+# Both endpoints read in-memory state only: no template rendering, disk I/O or Gemini calls.
+HEALTHZ_HEADERS = {'Cache-Control': 'no-store'}
+
+def readiness_payload() -> tuple[dict, int]:
+    """
+    Return (body, status code) for /readyz: 503 until model discovery has settled,
+    or for at most GEMINI_DISCOVERY_TIMEOUT seconds, after which the fallback generator serves.
+    """
+    with _discovery_lock:
+        state = DISCOVERY_STATUS['state']
+        error = DISCOVERY_STATUS['error']
+        started_at = DISCOVERY_STATUS['started_at']
+        model = GEMINI_MODEL
+    timed_out = (state == 'running' and started_at is not None
+                 and time.time() - started_at >= GEMINI_DISCOVERY_TIMEOUT)
+    ready = state in DISCOVERY_SETTLED_STATES or timed_out
+    breakers = MODEL_REGISTRY.states()
+    return {
+        'ready': ready,
+        'discovery': state,
+        'discovery_timed_out': timed_out,
+        'error': error,
+        'model': model.model_name if model is not None else None,
+        'source': 'Gemini API' if model is not None else 'Fallback Generator',
+        'breakers': breakers,
+        'healthy_models': sum(1 for breaker_state in breakers.values() if breaker_state != 'open'),
+        'queues': {
+            'gemini_in_flight': SINGLE_FLIGHT.stats()['in_flight'],
+            # Executor backlog: calls waiting for a free GEMINI_BACKGROUND worker
+            'gemini_backlog': GEMINI_BACKGROUND._work_queue.qsize(),
+            'rate_limit_waiting': RATE_LIMITER.waiting,
+            'report_store_pending': REPORT_STORE.stats()['pending_writes'],
+        },
+    }, 200 if ready else 503
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: answers as long as the process can serve requests."""
+    return Response('ok\n', mimetype='text/plain', headers=HEALTHZ_HEADERS)
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: discovery state, breaker states and queue depths."""
+    body, status_code = readiness_payload()
+    return jsonify(body), status_code, HEALTHZ_HEADERS
+
+def disc_error_payload(disc: str):
+    """Return an error body if no DISC dimension can be read from the input, else None."""
+    if not parse_disc_profile(disc).empty:
+        return None
+    return {
+        'error': f"Could not understand the DISC profile '{html.escape(disc)}'. "
+                 "Try something like 'High C, low I' or 'D: 15, I: 8, S: 12, C: 20'."
+    }
+
+def profile_error_payload(birth, disc):
+    """
+    Return an error body for /generate inputs that are not strings, longer than MAX_INPUT_CHARS
+    or not a readable DISC profile, else None.
+    """
+    for field, value in (('birth', birth), ('disc', disc)):
+        if not isinstance(value, str):
+            return {'error': f'"{field}" must be a string.'}
+        if len(value) > MAX_INPUT_CHARS:
+            return {'error': f'"{field}" must be at most {MAX_INPUT_CHARS} characters.'}
+    return disc_error_payload(disc)
+
+def _reject_invalid_profile(birth, disc):
+    """Return a 400 response for inputs profile_error_payload() rejects, else None."""
+    error = profile_error_payload(birth, disc)
+    return None if error is None else (jsonify(error), 400)
 
 @app.route('/generate', methods=['POST'])
 def generate():
-    data = request.get_json(silent=True) or {}
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
     birth = data.get('birth', BIRTH_CHART)
     disc = data.get('disc', DISC_PROFILE)
 
+    # Don't spend a Gemini call on a DISC profile nobody can interpret
+    rejection = _reject_invalid_profile(birth, disc)
+    if rejection is not None:
+        return rejection
+
     try:
-        # Use Gemini API if available, otherwise fallback to rule-based generator
+        # Cached Gemini output first, then Gemini API if available, otherwise the rule-based generator
         if GEMINI_AVAILABLE:
             print(f"🚀 Using Gemini API for birth chart: {birth}, DISC: {disc}")
-            paragraph = generate_gemini_paragraph(birth, disc)
         else:
             print(f"📝 Using fallback generator for birth chart: {birth}, DISC: {disc}")
-            paragraph = generate_fallback_paragraph(birth, disc)
+        paragraph, source = generate_career_paragraph(birth, disc, request_deadline(GENERATE_DEADLINE))
         
         return jsonify({ 
             'paragraph': paragraph,
-            'source': 'Gemini API' if GEMINI_AVAILABLE else 'Fallback Generator'
+            'source': source
         })
     except Exception as e:
         print(f"❌ Error generating paragraph: {e}")
         return jsonify({ 'error': 'Failed to generate paragraph.' }), 500
 
 
+@app.route('/generate/batch', methods=['POST'])
+def generate_batch_route():
+    """Generate reports for a list of profiles; results are returned in input order."""
+    error, profiles, concurrency = batch_request_error(request.get_json(silent=True) or {})
+    if error is not None:
+        return jsonify(error), 400
+
+    started = time.perf_counter()
+    print(f"📦 Generating batch of {len(profiles)} profiles")
+    results = generate_batch(profiles, concurrency, request_deadline(BATCH_DEADLINE))
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+    })
+
+@app.route('/generate/stream', methods=['GET', 'POST'])
+def generate_stream():
+    """Server-Sent Events version of /generate: 'chunk' events, then one 'done' event."""
+    data = request.get_json(silent=True) if request.method == 'POST' else request.args
+    if not isinstance(data, dict):
+        data = {}
+    birth = data.get('birth', BIRTH_CHART)
+    disc = data.get('disc', DISC_PROFILE)
+
+    rejection = _reject_invalid_profile(birth, disc)
+    if rejection is not None:
+        return rejection
+
+    deadline = request_deadline(GENERATE_STREAM_DEADLINE)
+
+    def events():
+        try:
+            for event, payload in stream_career_paragraph(birth, disc, deadline):
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            print(f"❌ Error streaming paragraph: {e}")
+            yield f"event: error\ndata: {json.dumps({'error': 'Failed to generate paragraph.'})}\n\n"
+
+    print(f"📡 Streaming report for birth chart: {birth}, DISC: {disc}")
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+# =====================
+# Async (ASGI) serving
+# =====================
+def create_asgi_app():
+    """
+    Build the ASGI app: async /generate, /generate/batch, /models, /api-status, /metrics, /healthz and /readyz
+    handlers that never hold a thread while Gemini works, with every other route served by the Flask
+    app as before.
+    Responses are compressed the same way on both paths.
+
+    Run with `python main.py --asgi` or `uvicorn main:create_asgi_app --factory`.
+    """
+    from a2wsgi import WSGIMiddleware
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, PlainTextResponse, Response as StarletteResponse
+    from starlette.routing import Mount, Route
+
+    def encoded_response(request, content, status_code: int = 200, conditional: bool = False, headers=None):
+        """JSONResponse with the compression and ETag handling compress_response() gives the Flask routes."""
+        response = JSONResponse(content, status_code=status_code, headers=headers)
+        if status_code != 200:
+            return response
+        body = response.body
+        encoding = negotiate_encoding(request.headers.get('accept-encoding', ''), response.media_type, len(body))
+        headers = dict(headers or {}, Vary='Accept-Encoding')
+        if conditional:
+            etag = content_etag(body, encoding)
+            headers['ETag'] = f'"{etag}"'
+            if parse_etags(request.headers.get('if-none-match')).contains_weak(etag):
+                return StarletteResponse(status_code=304, headers=headers)
+        if encoding != 'identity':
+            body = compress_body(body, encoding)
+            headers['Content-Encoding'] = encoding
+        return StarletteResponse(body, status_code=status_code, headers=headers, media_type=response.media_type)
+
+    async def generate_async(request):
+        try:
+            data = await request.json()
+        except ValueError:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        birth = data.get('birth', BIRTH_CHART)
+        disc = data.get('disc', DISC_PROFILE)
+
+        error = profile_error_payload(birth, disc)
+        if error is not None:
+            return JSONResponse(error, status_code=400)
+
+        try:
+            paragraph, source = await generate_career_paragraph_async(
+                birth, disc, request_deadline(GENERATE_DEADLINE)
+            )
+            return encoded_response(request, {'paragraph': paragraph, 'source': source})
+        except Exception as e:
+            print(f"❌ Error generating paragraph: {e}")
+            return JSONResponse({'error': 'Failed to generate paragraph.'}, status_code=500)
+
+    async def generate_batch_async_route(request):
+        try:
+            data = await request.json()
+        except ValueError:
+            data = {}
+        error, profiles, concurrency = batch_request_error(data)
+        if error is not None:
+            return JSONResponse(error, status_code=400)
+
+        started = time.perf_counter()
+        results = await generate_batch_async(profiles, concurrency, request_deadline(BATCH_DEADLINE))
+        return encoded_response(request, {
+            'results': results,
+            'count': len(results),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+        })
+
+    async def models_async(request):
+        # Served from memory; only a missing catalogue makes a (threaded) API call
+        models, _ = MODEL_CATALOGUE.get()
+        if models is None:
+            body, status_code, headers = await asyncio.to_thread(list_models_payload)
+        else:
+            body, status_code, headers = list_models_payload()
+        return encoded_response(request, body, status_code, conditional=True, headers=headers)
+
+    # Native routes, so platform probes never queue behind the WSGI thread pool
+    async def healthz_async(request):
+        return PlainTextResponse('ok\n', headers=HEALTHZ_HEADERS)
+
+    async def readyz_async(request):
+        body, status_code = readiness_payload()
+        return JSONResponse(body, status_code=status_code, headers=HEALTHZ_HEADERS)
+
+    async def api_status_async(request):
+        return encoded_response(request, api_status_payload(), conditional=True)
+
+    async def metrics_async(request):
+        return encoded_response(request, metrics_payload(), headers=METRICS_HEADERS)
+
+    return Starlette(routes=[
+        Route('/generate', generate_async, methods=['POST']),
+        Route('/generate/batch', generate_batch_async_route, methods=['POST']),
+        Route('/models', models_async),
+        Route('/api-status', api_status_async),
+        Route('/metrics', metrics_async),
+        Route('/healthz', healthz_async),
+        Route('/readyz', readyz_async),
+        Mount('/', app=WSGIMiddleware(app)),
+    ])
+
+
 def run_cli():
     # The assessment explicitly wants a command-line script that uses the input data and prints a single paragraph.
     print("🔮 AstroDISC™ Lite - Career Recommendation Generator")
@@ -871,6 +3867,10 @@ def run_cli():
     print(f"DISC Profile: {DISC_PROFILE}")
     print("=" * 60)
     
+    # The CLI prints a single paragraph, so it is worth waiting for discovery here
+    if not wait_for_discovery(GEMINI_DISCOVERY_TIMEOUT):
+        print(f"⏳ Model discovery still running after {GEMINI_DISCOVERY_TIMEOUT:.0f}s, continuing without it")
+    
     if GEMINI_AVAILABLE:
         print("🚀 Using Gemini API for AI-powered insights...")
         paragraph = generate_gemini_paragraph(BIRTH_CHART, DISC_PROFILE)
@@ -881,7 +3881,7 @@ def run_cli():
         print("\n📋 Generated Career Recommendation:")
     
     print("-" * 60)
-    print(paragraph)
+    print(textwrap.fill(paragraph, width=100))
     print("-" * 60)
     
     if not GEMINI_AVAILABLE:
@@ -890,6 +3890,267 @@ def run_cli():
         print("2. Create a .env file with: GEMINI_API_KEY=your_key_here")
         print("3. Restart the application")
 
+# =====================
+# Bulk CLI (--batch)
+# =====================
+BATCH_OUTPUT_FIELDS = ('record', 'id', 'birth', 'disc', 'paragraph', 'source', 'latency_ms', 'error')
+BATCH_CHECKPOINT_EVERY = 100      # records between checkpoints
+BATCH_PROGRESS_SECONDS = 2.0      # seconds between progress lines
+
+def _read_batch_records(path: str):
+    """Lazily yield one dict per input record from a .csv (header row) or .jsonl file."""
+    with open(path, newline='', encoding='utf-8') as fh:
+        if path.lower().endswith('.csv'):
+            yield from csv.DictReader(fh)
+            return
+        for line in fh:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield {'_error': 'Invalid JSON line'}
+
+def _count_batch_records(path: str) -> int:
+    """Count records with a cheap binary pass, for the ETA."""
+    with open(path, 'rb') as fh:
+        count = sum(1 for line in fh if line.strip())
+    return count - 1 if path.lower().endswith('.csv') and count else count
+
+def _process_batch_record(number: int, record) -> dict:
+    row = {'record': number}
+    if not isinstance(record, dict) or '_error' in record:
+        row['error'] = record.get('_error') if isinstance(record, dict) else 'Record must be an object'
+        return row
+    row['id'] = record.get('id')
+    birth, disc = record.get('birth'), record.get('disc')
+    row.update(birth=birth, disc=disc)
+    if not birth or not disc:
+        row['error'] = 'Record needs both "birth" and "disc"'
+        return row
+    error = disc_error_payload(str(disc))
+    if error is not None:
+        row['error'] = html.unescape(error['error'])
+        return row
+    started = time.perf_counter()
+    try:
+        # Nobody is waiting on a bulk job: queue for rate budget rather than write fallback rows
+        row['paragraph'], row['source'] = generate_career_paragraph(str(birth), str(disc), rate_wait=OFFLINE_RATE_WAIT)
+    except Exception as e:
+        row['error'] = f'Generation failed: {e}'
+    row['latency_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    return row
+
+def _encode_batch_row(row: dict, as_csv: bool) -> bytes:
+    if not as_csv:
+        return (json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8')
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(['' if row.get(f) is None else row.get(f) for f in BATCH_OUTPUT_FIELDS])
+    return buffer.getvalue().encode('utf-8')
+
+def _load_batch_checkpoint(checkpoint_path: str, input_path: str, output_path: str):
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as fh:
+            checkpoint = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if (checkpoint.get('input') != os.path.abspath(input_path)
+            or checkpoint.get('output') != os.path.abspath(output_path)
+            or not os.path.exists(output_path)):
+        print(f"⚠️  Ignoring checkpoint {checkpoint_path}: it belongs to a different job")
+        return None
+    return checkpoint
+
+def _save_batch_checkpoint(checkpoint_path: str, state: dict) -> None:
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(dict(state, updated_at=time.time()), fh)
+    os.replace(tmp_path, checkpoint_path)
+
+def run_batch_cli(input_path: str, output_path: str, workers: int = None, checkpoint_path: str = None) -> None:
+    """
+    Generate paragraphs for every record in a JSONL/CSV file, writing results in input order.
+
+    Records are streamed and at most a few windows of work are in flight, so memory stays
+    flat regardless of file size. A checkpoint (records done + output byte offset) is saved
+    regularly; rerunning the same command resumes after the last checkpoint.
+    """
+    workers = max(1, workers or BATCH_CONCURRENCY)
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+    as_csv = output_path.lower().endswith('.csv')
+
+    print("🔮 AstroDISC™ Lite - Bulk Generation")
+    print("=" * 60)
+    if not wait_for_discovery(GEMINI_DISCOVERY_TIMEOUT):
+        print(f"⏳ Model discovery still running after {GEMINI_DISCOVERY_TIMEOUT:.0f}s, continuing without it")
+    print(f"🔑 Generator: {'Gemini API' if GEMINI_AVAILABLE else 'Fallback Generator'}")
+
+    total = _count_batch_records(input_path)
+    checkpoint = _load_batch_checkpoint(checkpoint_path, input_path, output_path)
+    state = {
+        'input': os.path.abspath(input_path),
+        'output': os.path.abspath(output_path),
+        'records_done': 0,
+        'output_bytes': 0,
+        'errors': 0,
+    }
+    if checkpoint:
+        state.update(
+            records_done=checkpoint['records_done'],
+            output_bytes=checkpoint['output_bytes'],
+            errors=checkpoint.get('errors', 0),
+        )
+        print(f"↩️  Resuming after record {state['records_done']:,} of {total:,}")
+    print(f"📥 {input_path} → 📤 {output_path} ({total:,} records, {workers} workers)")
+    print("=" * 60)
+
+    out = open(output_path, 'r+b' if checkpoint else 'wb')
+    # Drop anything written after the last checkpoint; those records will be redone
+    out.truncate(state['output_bytes'])
+    out.seek(state['output_bytes'])
+    if as_csv and state['output_bytes'] == 0:
+        out.write(_encode_batch_row({f: f for f in BATCH_OUTPUT_FIELDS}, as_csv=True))
+
+    started = last_report = time.monotonic()
+    processed_this_run = 0
+    window = deque()
+    max_in_flight = workers * 4
+
+    def write_head():
+        nonlocal processed_this_run, last_report
+        row = window.popleft().result()
+        out.write(_encode_batch_row(row, as_csv))
+        state['records_done'] += 1
+        state['errors'] += 'error' in row
+        processed_this_run += 1
+        if state['records_done'] % BATCH_CHECKPOINT_EVERY == 0:
+            out.flush()
+            state['output_bytes'] = out.tell()
+            _save_batch_checkpoint(checkpoint_path, state)
+        now = time.monotonic()
+        if now - last_report >= BATCH_PROGRESS_SECONDS:
+            last_report = now
+            rate = processed_this_run / (now - started)
+            remaining = max(0, total - state['records_done'])
+            eta = f"{remaining / rate:,.0f}s" if rate else '?'
+            print(f"📈 {state['records_done']:,}/{total:,} records | {rate:,.1f}/s | "
+                  f"errors {state['errors'] / state['records_done']:.1%} | ETA {eta}")
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bulk')
+    try:
+        records = islice(_read_batch_records(input_path), state['records_done'], None)
+        for number, record in enumerate(records, start=state['records_done'] + 1):
+            window.append(executor.submit(_process_batch_record, number, record))
+            while len(window) >= max_in_flight or (window and window[0].done()):
+                write_head()
+        while window:
+            write_head()
+    except KeyboardInterrupt:
+        print(f"\n⏸️  Interrupted after record {state['records_done']:,}; rerun the same command to resume")
+        raise SystemExit(130)
+    finally:
+        # Unwritten results are simply redone on resume
+        executor.shutdown(wait=False, cancel_futures=True)
+        out.flush()
+        state['output_bytes'] = out.tell()
+        out.close()
+        if state['records_done'] < total:
+            _save_batch_checkpoint(checkpoint_path, state)
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    elapsed = time.monotonic() - started
+    print("=" * 60)
+    print(f"✅ Done: {state['records_done']:,} records, {state['errors']:,} errors, "
+          f"{processed_this_run / elapsed if elapsed else 0:,.1f} records/s this run")
+
+# =====================
+# Report table build (--build-table)
+# =====================
+REPORT_TABLE_COMMIT_EVERY = 200   # rows per transaction
+
+def _report_table_inputs():
+    """Yield (row id, birth chart, DISC profile) for every row of the report table."""
+    for sun in ZODIAC_SIGNS:
+        for ascendant in ZODIAC_SIGNS:
+            birth = f"Sun in {sun}, Ascendant in {ascendant}"
+            for code in REPORT_TABLE_DISC_CODES:
+                row_id = (_SIGN_SLOT[sun] * len(ZODIAC_SIGNS) + _SIGN_SLOT[ascendant]) * 256 + code
+                yield row_id, birth, DiscProfile(_disc_levels(code)).canonical
+
+def _build_report_row(row_id: int, birth: str, disc: str):
+    # The build has no one waiting on it, so it queues for rate budget instead of falling back
+    paragraph = request_gemini_paragraph(birth, disc, rate_wait=OFFLINE_RATE_WAIT) if GEMINI_AVAILABLE else None
+    source = 'Gemini API'
+    if paragraph is None:
+        paragraph, source = generate_fallback_paragraph(birth, disc), 'Fallback Generator'
+    return row_id, birth, disc, paragraph, source, time.time()
+
+def build_report_table(path: str = None, workers: int = None) -> None:
+    """
+    Precompute a report for every Sun x Ascendant x REPORT_TABLE_DISC_CODES combination.
+
+    Uses Gemini when a model is available and the fallback generator otherwise. Rows already
+    generated by Gemini are kept, so rerunning the build resumes it and upgrades fallback rows.
+    """
+    path = path or REPORT_TABLE_PATH
+    workers = max(1, workers or BATCH_CONCURRENCY)
+
+    print("🔮 AstroDISC™ Lite - Report Table Build")
+    print("=" * 60)
+    if not wait_for_discovery(GEMINI_DISCOVERY_TIMEOUT):
+        print(f"⏳ Model discovery still running after {GEMINI_DISCOVERY_TIMEOUT:.0f}s, continuing without it")
+    print(f"🔑 Generator: {'Gemini API' if GEMINI_AVAILABLE else 'Fallback Generator'}")
+
+    connection = sqlite3.connect(path)
+    connection.execute(_REPORT_TABLE_SCHEMA)
+    done = {row[0] for row in connection.execute("SELECT id FROM reports WHERE source = 'Gemini API'")}
+    todo = [row for row in _report_table_inputs() if row[0] not in done]
+    total = len(todo) + len(done)
+    print(f"📤 {path} ({total:,} reports, {len(done):,} already from Gemini, {workers} workers)")
+    print("=" * 60)
+
+    started = last_report = time.monotonic()
+    written = 0
+    pending_rows = []
+
+    def flush():
+        connection.executemany("INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?)", pending_rows)
+        connection.commit()
+        pending_rows.clear()
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='table')
+    try:
+        futures = [executor.submit(_build_report_row, *row) for row in todo]
+        for future in futures:
+            pending_rows.append(future.result())
+            written += 1
+            if len(pending_rows) >= REPORT_TABLE_COMMIT_EVERY:
+                flush()
+            now = time.monotonic()
+            if now - last_report >= BATCH_PROGRESS_SECONDS:
+                last_report = now
+                rate = written / (now - started)
+                print(f"📈 {written + len(done):,}/{total:,} reports | {rate:,.1f}/s | "
+                      f"ETA {(len(todo) - written) / rate:,.0f}s")
+    except KeyboardInterrupt:
+        print(f"\n⏸️  Interrupted after {written:,} new reports; rerun the same command to resume")
+        raise SystemExit(130)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if pending_rows:
+            flush()
+        from_gemini = connection.execute("SELECT COUNT(*) FROM reports WHERE source = 'Gemini API'").fetchone()[0]
+        connection.close()
+
+    if os.path.abspath(path) == os.path.abspath(REPORT_TABLE.path):
+        REPORT_TABLE.reload()
+    print("=" * 60)
+    print(f"✅ Done: {total:,} reports, {from_gemini:,} from Gemini "
+          f"({time.monotonic() - started:,.1f}s this run)")
+    if from_gemini < total:
+        print("💡 Fallback rows are not served; rerun with Gemini available to fill them in")
+
 # =====================
 # Entrypoint
 # =====================
@@ -898,16 +4159,34 @@ if __name__ == '__main__':
     parser.add_argument('--cli', action='store_true', help='Run in CLI mode and print the paragraph to console')
     parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'), help='Host for web server')
     parser.add_argument('--port', default=int(os.environ.get('PORT', 5000)), type=int, help='Port for web server')
+    parser.add_argument('--asgi', action='store_true', help='Serve with uvicorn using the async request handlers')
+    parser.add_argument('--batch', metavar='INPUT', help='Generate paragraphs for every record in a .jsonl or .csv file')
+    parser.add_argument('--out', metavar='OUTPUT', help='Output .jsonl or .csv file for --batch')
+    parser.add_argument('--workers', type=int, default=BATCH_CONCURRENCY, help='Parallel generations for --batch and --build-table')
+    parser.add_argument('--checkpoint', metavar='PATH', help='Checkpoint file for --batch (default: OUTPUT.checkpoint)')
+    parser.add_argument('--build-table', nargs='?', const=REPORT_TABLE_PATH, metavar='PATH',
+                        help='Precompute the report table (default: REPORT_TABLE_PATH)')
     args = parser.parse_args()
 
-    if args.cli:
+    if args.build_table:
+        build_report_table(args.build_table, args.workers)
+    elif args.batch:
+        if not args.out:
+            parser.error('--batch requires --out')
+        run_batch_cli(args.batch, args.out, args.workers, args.checkpoint)
+    elif args.cli:
         run_cli()
+    elif args.asgi:
+        import uvicorn
+        print("🌟 AstroDISC™ Lite - Career Insights Platform (async)")
+        print(f"🌐 Web Interface: http://{args.host}:{args.port}")
+        uvicorn.run(create_asgi_app(), host=args.host, port=args.port)
     else:
         print("🌟 AstroDISC™ Lite - Career Insights Platform")
         print("=" * 50)
         print(f"🌐 Web Interface: http://{args.host}:{args.port}")
-        print(f"🔑 Gemini API: {'✅ Available' if GEMINI_AVAILABLE else '❌ Not Available'}")
-        if not GEMINI_AVAILABLE:
+        print(f"🔑 Gemini API: {'🔍 Discovering models in background' if GEMINI_API_KEY else '❌ Not Available'}")
+        if not GEMINI_API_KEY:
             print("💡 To enable Gemini API, set GEMINI_API_KEY in .env file")
         print("=" * 50)
         app.run(host=args.host, port=args.port, debug=True)
@@ -0,0 +1,151 @@
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+
+# main reads its configuration at import time, so keep the suite offline and off disk first.
+# An empty key also stops load_dotenv() from picking up a real one from .env.
+os.environ['GEMINI_API_KEY'] = ''
+os.environ['REPORT_STORE_PATH'] = ''
+os.environ['REPORT_TABLE_PATH'] = ''
+os.environ['GEMINI_MODEL_CACHE_PATH'] = ''
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import main
+
+EXAMPLES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples.md')
+
+
+def examples(start, end):
+    """Backticked inputs between two headings of examples.md."""
+    with open(EXAMPLES_PATH, encoding='utf-8') as fh:
+        text = fh.read()
+    section = text.split(start, 1)[1].split(end, 1)[0]
+    return sorted(set(re.findall(r'`([^`]+)`', section)))
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    main.RESPONSE_CACHE.clear()
+    yield
+    main.RESPONSE_CACHE.clear()
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(main.time, 'monotonic', fake)
+    return fake
+
+
+PARAGRAPH = 'Hello there. You are great. Really. Done now.'
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """
+    Stands in for genai.GenerativeModel: streams `text` a sentence at a time, `delay` seconds
+    apart, or raises `error` after `delay` seconds. Counts calls, and streams that were read to the end or closed.
+    """
+
+    def __init__(self, name='gemini-test', delay=0.0, error=None, text=PARAGRAPH):
+        self.model_name = f'models/{name}'
+        self.delay = delay
+        self.error = error
+        self.pieces = re.split(r'(?<=\. )', text)
+        self.calls = self.closed = 0
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            self.calls += 1
+
+    def _fail(self):
+        with self._lock:
+            self.closed += 1
+        raise RuntimeError(self.error)
+
+    def _close(self):
+        with self._lock:
+            self.closed += 1
+
+    def generate_content(self, prompt, **kwargs):
+        self._start()
+        if self.error is not None:
+            time.sleep(self.delay)
+            self._fail()
+
+        def chunks():
+            try:
+                for piece in self.pieces:
+                    time.sleep(self.delay)
+                    yield FakeChunk(piece)
+            finally:
+                self._close()
+        return chunks()
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self._start()
+        if self.error is not None:
+            await asyncio.sleep(self.delay)
+            self._fail()
+
+        async def chunks():
+            try:
+                for piece in self.pieces:
+                    await asyncio.sleep(self.delay)
+                    yield FakeChunk(piece)
+            finally:
+                self._close()
+        return chunks()
+
+    def wait_closed(self, count=None, timeout=5.0):
+        """Block until `count` streams (default: every call) have ended."""
+        give_up_at = time.monotonic() + timeout
+        while self.closed < (self.calls if count is None else count):
+            assert time.monotonic() < give_up_at, f'{self.model_name} streams still open'
+            time.sleep(0.01)
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """
+    Returns install(*models): registers fake models (first one active) in a fresh model registry.
+    Single-flight state is fresh as well, and Gemini is switched off again afterwards.
+    """
+    monkeypatch.setattr(main, 'MODEL_REGISTRY', main.ModelRegistry())
+    monkeypatch.setattr(main, 'SINGLE_FLIGHT', main.SingleFlight(main.SINGLE_FLIGHT_TIMEOUT))
+
+    def install(*models):
+        for model in models:
+            main.MODEL_REGISTRY.register(model)
+        main._set_active_model(models[0])
+        return models
+    yield install
+    main._set_active_model(None)
+
+
+def breaker_for(model):
+    return next(b for b in main.MODEL_REGISTRY._breakers if b.model is model)
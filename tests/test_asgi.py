@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from starlette.testclient import TestClient
+
+import main
+from conftest import PARAGRAPH, FakeModel
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.create_asgi_app()) as test_client:
+        yield test_client
+
+
+def _async_only(model):
+    """Fail the test's Gemini calls if anything uses the blocking client."""
+    def blocking(*args, **kwargs):
+        raise AssertionError('blocking Gemini client used on the async path')
+    model.generate_content = blocking
+    return model
+
+
+def test_generate_uses_the_async_client(gemini, client):
+    model, = gemini(_async_only(FakeModel()))
+    response = client.post('/generate', json={'birth': 'Sun in Leo', 'disc': 'High D'})
+    assert response.status_code == 200
+    assert response.json() == {'paragraph': PARAGRAPH, 'source': 'Gemini API'}
+    assert model.calls == 1
+
+
+def test_generate_falls_back_without_a_model(client):
+    response = client.post('/generate', json={'birth': 'Sun in Leo', 'disc': 'High D'})
+    assert response.json()['source'] == 'Fallback Generator'
+
+
+@pytest.mark.parametrize('body', [{'disc': 'bananas'}, {'disc': 7}])
+def test_generate_rejects_invalid_profiles(client, body):
+    response = client.post('/generate', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+
+def test_concurrent_async_callers_share_one_call(gemini):
+    model, = gemini(_async_only(FakeModel(delay=0.02)))
+
+    async def burst():
+        return await asyncio.gather(*(
+            main.generate_career_paragraph_async('Sun in Leo', 'High D') for _ in range(10)
+        ))
+    results = asyncio.run(burst())
+    assert model.calls == 1
+    assert {source for _, source in results} <= {'Gemini API', 'cache'}
+
+
+def test_async_batch_keeps_input_order(gemini, client):
+    gemini(_async_only(FakeModel()))
+    profiles = [{'birth': 'Sun in Leo', 'disc': disc} for disc in ('High D', 'High I', 'High D')]
+    response = client.post('/generate/batch', json={'profiles': profiles})
+    results = response.json()['results']
+    assert [result['source'] for result in results] == ['Gemini API', 'Gemini API', 'Gemini API']
+    assert results[2].get('deduplicated') is True
+
+
+def test_flask_routes_are_mounted(client):
+    response = client.get('/')
+    assert response.status_code == 200
+    assert 'AstroDISC' in response.text
+
+
+@pytest.mark.parametrize('path', ['/api-status', '/metrics', '/readyz'])
+def test_status_routes_answer_natively(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/json'
+
+
+def test_healthz(client):
+    response = client.get('/healthz')
+    assert response.text == 'ok\n'
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+import main
+from conftest import PARAGRAPH, FakeModel
+
+
+def _post(body):
+    return main.app.test_client().post('/generate/batch', json=body)
+
+
+def test_batch_results_keep_input_order_and_deduplicate(gemini):
+    model, = gemini(FakeModel())
+    profiles = [{'birth': 'Sun in Leo', 'disc': disc} for disc in ('High D', 'High I', 'D: high')]
+    response = _post({'profiles': profiles})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['paragraph'] for result in results] == [PARAGRAPH] * 3
+    assert results[2]['deduplicated'] is True
+    assert model.calls == 2
+
+    again = _post({'profiles': profiles[:1]}).get_json()['results']
+    assert again[0]['source'] == 'cache'
+
+
+@pytest.mark.parametrize('profile, error', [
+    ({'birth': None, 'disc': 'High C'}, '"birth" must be a string.'),
+    ({'birth': 'Sun in Leo', 'disc': 5}, '"disc" must be a string.'),
+    ({'birth': 'Sun in Leo', 'disc': 'bananas'}, None),
+    ('Sun in Leo', 'Each profile must be an object with "birth" and "disc".'),
+])
+def test_invalid_items_get_their_own_error(profile, error):
+    results = _post({'profiles': [profile, {'birth': 'Sun in Leo', 'disc': 'High C'}]}).get_json()['results']
+    assert 'error' in results[0] and 'paragraph' not in results[0]
+    if error is not None:
+        assert results[0]['error'] == error
+    assert results[1]['source'] == 'Fallback Generator'
+
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'profiles': []},
+    {'profiles': [{}], 'concurrency': True},
+    {'profiles': [{}], 'concurrency': 0},
+    {'profiles': [{}], 'concurrency': '4'},
+])
+def test_malformed_batches_are_rejected(body):
+    assert _post(body).status_code == 400
+
+
+def test_too_many_profiles_are_rejected(monkeypatch):
+    monkeypatch.setattr(main, 'BATCH_MAX_PROFILES', 2)
+    assert _post({'profiles': [{}, {}, {}]}).status_code == 400
+
+
+def _late_batch(gemini):
+    model, = gemini(FakeModel(delay=0.05))
+    profiles = [{'birth': 'Sun in Leo', 'disc': disc} for disc in ('High D', 'High I', 'High S')]
+    return model, profiles
+
+
+def test_no_gemini_call_starts_after_the_batch_deadline(gemini):
+    model, profiles = _late_batch(gemini)
+    results = main.generate_batch(profiles, concurrency=1, deadline=main.request_deadline(0.05))
+    assert [result['source'] for result in results] == ['Fallback Generator'] * 3
+    time.sleep(0.3)  # the first call finishes in the background; nothing else may start
+    assert model.calls == 1
+
+
+def test_no_async_gemini_call_starts_after_the_batch_deadline(gemini):
+    model, profiles = _late_batch(gemini)
+    results = asyncio.run(main.generate_batch_async(profiles, concurrency=1, deadline=main.request_deadline(0.05)))
+    assert [result['source'] for result in results] == ['Fallback Generator'] * 3
+    assert model.calls == 1
@@ -0,0 +1,115 @@
+import json
+import os
+
+import pytest
+
+import main
+
+
+def _write_records(path, count):
+    signs = main.ZODIAC_SIGNS
+    with open(path, 'w', encoding='utf-8') as fh:
+        for i in range(count):
+            fh.write(json.dumps({
+                'id': i,
+                'birth': f'Sun in {signs[i % 12]}, Ascendant in {signs[(i + 5) % 12]}',
+                'disc': ('High C, low I', 'High D, Low S', 'D15-I8-S12-C20')[i % 3],
+            }) + '\n')
+
+
+def _read_rows(path):
+    with open(path, encoding='utf-8') as fh:
+        rows = [json.loads(line) for line in fh]
+    for row in rows:
+        row.pop('latency_ms', None)
+    return rows
+
+
+@pytest.fixture
+def job(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'BATCH_CHECKPOINT_EVERY', 2)
+    source = tmp_path / 'in.jsonl'
+    _write_records(source, 8)
+    return str(source), str(tmp_path / 'out.jsonl'), str(tmp_path / 'out.jsonl.checkpoint')
+
+
+def test_batch_writes_every_record_in_order(job):
+    source, output, checkpoint = job
+    main.run_batch_cli(source, output, workers=4)
+    rows = _read_rows(output)
+    assert [row['record'] for row in rows] == list(range(1, 9))
+    assert [row['id'] for row in rows] == list(range(8))
+    assert all(row['source'] == 'Fallback Generator' for row in rows)
+    assert not os.path.exists(checkpoint)
+
+
+def test_batch_resumes_after_interruption(job, monkeypatch):
+    source, output, checkpoint = job
+    process = main._process_batch_record
+    seen = []
+
+    def interrupted(number, record):
+        if number == 5:
+            raise KeyboardInterrupt
+        return process(number, record)
+
+    monkeypatch.setattr(main, '_process_batch_record', interrupted)
+    with pytest.raises(SystemExit):
+        main.run_batch_cli(source, output, workers=1)
+    with open(checkpoint, encoding='utf-8') as fh:
+        saved = json.load(fh)
+    assert saved['records_done'] == 4
+    assert saved['output_bytes'] == os.path.getsize(output)
+
+    def counted(number, record):
+        seen.append(number)
+        return process(number, record)
+
+    monkeypatch.setattr(main, '_process_batch_record', counted)
+    main.run_batch_cli(source, output, workers=1)
+    assert sorted(seen) == [5, 6, 7, 8]
+    assert not os.path.exists(checkpoint)
+
+    resumed = _read_rows(output)
+    main.run_batch_cli(source, output + '.fresh', workers=1)
+    assert resumed == _read_rows(output + '.fresh')
+
+
+def test_batch_drops_output_written_after_the_checkpoint(job):
+    source, output, checkpoint = job
+    main.run_batch_cli(source, output, workers=1)
+    with open(output, 'rb') as fh:
+        lines = fh.readlines()
+    kept = b''.join(lines[:2])
+    with open(output, 'wb') as fh:
+        fh.write(kept + b'{"record": 3, "partial')
+    with open(checkpoint, 'w', encoding='utf-8') as fh:
+        json.dump({
+            'input': os.path.abspath(source),
+            'output': os.path.abspath(output),
+            'records_done': 2,
+            'output_bytes': len(kept),
+        }, fh)
+
+    main.run_batch_cli(source, output, workers=1)
+    assert [row['record'] for row in _read_rows(output)] == list(range(1, 9))
+
+
+def test_batch_ignores_a_checkpoint_from_another_job(job, tmp_path):
+    source, output, checkpoint = job
+    with open(checkpoint, 'w', encoding='utf-8') as fh:
+        json.dump({'input': str(tmp_path / 'other.jsonl'), 'output': os.path.abspath(output),
+                   'records_done': 6, 'output_bytes': 0}, fh)
+    open(output, 'w').close()
+    main.run_batch_cli(source, output, workers=2)
+    assert len(_read_rows(output)) == 8
+
+
+def test_batch_reports_bad_records(tmp_path):
+    source = tmp_path / 'in.jsonl'
+    source.write_text('{"birth": "Sun in Leo"}\nnot json\n{"birth": "Sun in Leo", "disc": "bananas"}\n')
+    output = str(tmp_path / 'out.jsonl')
+    main.run_batch_cli(str(source), output, workers=1)
+    rows = _read_rows(output)
+    assert [bool(row.get('error')) for row in rows] == [True, True, True]
+    assert rows[1]['error'] == 'Invalid JSON line'
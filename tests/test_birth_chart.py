@@ -0,0 +1,61 @@
+import pytest
+
+import main
+from conftest import examples
+
+BIRTH_EXAMPLES = examples('## 🔮 Birth Chart Examples', '## 🎭 DISC Profile Examples')
+
+
+@pytest.mark.parametrize('text', BIRTH_EXAMPLES)
+def test_every_birth_chart_example_parses(text):
+    chart = main.parse_birth_chart(text)
+    assert chart.complete, chart
+    assert chart.sun is not None
+
+
+def test_examples_were_found():
+    assert len(BIRTH_EXAMPLES) >= 18
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Sun in Libra, Ascendant in Capricorn', 'Sun in Libra, Ascendant in Capricorn'),
+    ('Libra Sun, Taurus Moon, Capricorn Rising', 'Sun in Libra, Moon in Taurus, Ascendant in Capricorn'),
+    ('Sun Sign: Libra, Moon Sign: Cancer, Rising Sign: Aquarius',
+     'Sun in Libra, Moon in Cancer, Ascendant in Aquarius'),
+    ('Sun: Libra, Moon: Capricorn, Rising: Virgo, Venus: Scorpio, Mars: Aries, Saturn: Capricorn',
+     'Sun in Libra, Moon in Capricorn, Venus in Scorpio, Mars in Aries, Saturn in Capricorn, Ascendant in Virgo'),
+    ('Libra Sun, Capricorn Moon, Virgo Rising, Mercury in Scorpio, Jupiter in Sagittarius',
+     'Sun in Libra, Moon in Capricorn, Mercury in Scorpio, Jupiter in Sagittarius, Ascendant in Virgo'),
+    ('Libra Sun Aries Moon', 'Sun in Libra, Moon in Aries'),
+])
+def test_birth_chart_formats_share_a_canonical_form(text, expected):
+    chart = main.parse_birth_chart(text)
+    assert chart.complete
+    assert chart.canonical == expected
+
+
+@pytest.mark.parametrize('text', ['', 'hello world', 'Sun in Libra, Moon', 'Sun in Libra, Sun in Aries'])
+def test_birth_chart_incomplete_input(text):
+    assert not main.parse_birth_chart(text).complete
+
+
+@pytest.mark.parametrize('text', ['Libra Aries Sun', 'Sun Moon in Libra', 'Sun in Libra and Aries'])
+def test_two_names_for_one_placement_are_ambiguous(text):
+    chart = main.parse_birth_chart(text)
+    assert not chart.complete
+    assert chart.sun != 'Aries'
+
+
+def test_ambiguous_chart_is_kept_out_of_the_report_table_and_canonical_cache_key():
+    assert main.report_table_id('Libra Aries Sun, Ascendant in Leo', 'High C, low I') is None
+    assert (main.report_cache_key('Libra Aries Sun', 'High C')
+            != main.report_cache_key('Sun in Aries', 'High C'))
+
+
+@pytest.mark.parametrize('field', ['birth', 'disc'])
+def test_generate_rejects_oversized_input(field):
+    body = {'birth': 'Sun in Leo', 'disc': 'High C'}
+    body[field] += ' ' * main.MAX_INPUT_CHARS
+    response = main.app.test_client().post('/generate', json=body)
+    assert response.status_code == 400
+    assert field in response.get_json()['error']
@@ -0,0 +1,116 @@
+import types
+
+import pytest
+
+import main
+from conftest import PARAGRAPH, FakeModel, breaker_for
+
+
+@pytest.fixture
+def breaker(monkeypatch, clock):
+    monkeypatch.setattr(main, 'GEMINI_BREAKER_MIN_CALLS', 4)
+    monkeypatch.setattr(main, 'GEMINI_BREAKER_ERROR_RATE', 0.5)
+    monkeypatch.setattr(main, 'GEMINI_BREAKER_COOLDOWN', 30)
+    monkeypatch.setattr(main, 'GEMINI_BREAKER_SLOW_SECONDS', 10)
+    return main.ModelBreaker(types.SimpleNamespace(model_name='models/gemini-test'))
+
+
+def test_breaker_stays_closed_below_min_calls(breaker):
+    for _ in range(3):
+        breaker.record_failure(0.1, 'boom')
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_breaker_opens_at_error_rate(breaker):
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    breaker.record_failure(0.1, 'boom')
+    assert breaker.state == 'closed'
+    breaker.record_failure(0.1, 'boom')
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+
+def test_breaker_counts_slow_calls_as_failures(breaker):
+    for _ in range(4):
+        breaker.record_success(11)
+    assert breaker.state == 'open'
+    assert breaker.last_error.startswith('slow call')
+
+
+def _trip(breaker):
+    for _ in range(4):
+        breaker.record_failure(0.1, 'boom')
+    assert breaker.state == 'open'
+
+
+def test_breaker_admits_one_trial_after_cooldown(breaker, clock):
+    _trip(breaker)
+    clock.advance(29)
+    assert not breaker.allow()
+    clock.advance(1)
+    assert breaker.allow()
+    assert breaker.state == 'half_open'
+    assert not breaker.allow()  # the trial is already in flight
+
+
+def test_breaker_trial_success_closes(breaker, clock):
+    _trip(breaker)
+    clock.advance(30)
+    assert breaker.allow()
+    breaker.record_success(0.1)
+    assert breaker.state == 'closed'
+    assert breaker.snapshot()['calls'] == 1
+
+
+def test_breaker_trial_failure_reopens(breaker, clock):
+    _trip(breaker)
+    clock.advance(30)
+    assert breaker.allow()
+    breaker.record_failure(0.1, 'still down')
+    assert breaker.state == 'open'
+    clock.advance(29)
+    assert not breaker.allow()
+
+
+def test_breaker_release_frees_the_trial(breaker, clock):
+    _trip(breaker)
+    clock.advance(30)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+# =====================
+# Failover through the model registry
+# =====================
+def test_registry_orders_models_by_candidate_priority():
+    registry = main.ModelRegistry()
+    for name in ('gemini-2.0-flash', 'gemini-1.5-pro', 'something-else'):
+        registry.register(types.SimpleNamespace(model_name=f'models/{name}'))
+    registry.register(types.SimpleNamespace(model_name='models/gemini-1.5-pro'))
+    assert list(registry.states()) == ['gemini-1.5-pro', 'gemini-2.0-flash', 'something-else']
+
+
+def test_failing_model_fails_over_and_next_model_becomes_active(gemini):
+    broken, working = gemini(FakeModel('broken', error='503 unavailable'), FakeModel('working'))
+    assert main.request_gemini_paragraph('Sun in Leo', 'High D') == PARAGRAPH
+    assert broken.calls == 1 and working.calls == 1
+    assert main.GEMINI_MODEL is working
+    assert breaker_for(broken).snapshot()['error_rate'] == 1.0
+
+
+def test_open_breaker_is_skipped(gemini, monkeypatch):
+    monkeypatch.setattr(main, 'GEMINI_BREAKER_MIN_CALLS', 2)
+    broken, working = gemini(FakeModel('broken', error='503 unavailable'), FakeModel('working'))
+    for _ in range(3):
+        assert main.request_gemini_paragraph('Sun in Leo', 'High D') == PARAGRAPH
+    assert breaker_for(broken).state == 'open'
+    assert broken.calls == 2
+    assert working.calls == 3
+
+
+def test_no_healthy_model_returns_none(gemini):
+    gemini(FakeModel('broken', error='503 unavailable'))
+    assert main.request_gemini_paragraph('Sun in Leo', 'High D') is None
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import pytest
+
+import main
+from conftest import PARAGRAPH, FakeModel
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    fresh = {'fallbacks': 0, 'background_completed': 0, 'background_failed': 0}
+    monkeypatch.setattr(main, 'DEADLINE_STATS', fresh)
+    return fresh
+
+
+def _wait_for(condition, timeout=5.0):
+    give_up_at = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < give_up_at, 'condition never became true'
+        time.sleep(0.01)
+
+
+def test_no_deadline_without_a_budget():
+    assert main.request_deadline(0) is None
+    assert not main._deadline_passed(None)
+    assert main._deadline_passed(time.monotonic())
+
+
+def test_slow_gemini_falls_back_at_the_deadline_and_finishes_in_the_background(gemini, stats):
+    model, = gemini(FakeModel(delay=0.05))
+    started = time.monotonic()
+    paragraph, source = main.generate_career_paragraph('Sun in Leo', 'High D', main.request_deadline(0.05))
+    assert source == 'Fallback Generator'
+    assert time.monotonic() - started < 0.2
+    assert stats['fallbacks'] == 1
+
+    _wait_for(lambda: stats['background_completed'] == 1)
+    assert main.generate_career_paragraph('Sun in Leo', 'High D') == (PARAGRAPH, 'cache')
+    assert model.calls == 1
+
+
+def test_failed_background_call_is_counted(gemini, stats):
+    gemini(FakeModel(delay=0.1, error='boom'))
+    assert main.generate_career_paragraph('Sun in Leo', 'High I', main.request_deadline(0.02))[1] == 'Fallback Generator'
+    _wait_for(lambda: stats['background_failed'] == 1)
+    assert stats['background_completed'] == 0
+
+
+def test_async_path_honours_the_deadline(gemini, stats):
+    gemini(FakeModel(delay=0.05))
+    result = asyncio.run(main.generate_career_paragraph_async('Sun in Leo', 'High S', main.request_deadline(0.05)))
+    assert result[1] == 'Fallback Generator'
+    assert stats['fallbacks'] == 1
+
+
+def test_generate_route_uses_generate_deadline(gemini, stats, monkeypatch):
+    gemini(FakeModel(delay=0.05))
+    monkeypatch.setattr(main, 'GENERATE_DEADLINE', 0.05)
+    response = main.app.test_client().post('/generate', json={'birth': 'Sun in Leo', 'disc': 'High C'})
+    assert response.get_json()['source'] == 'Fallback Generator'
+    assert stats['fallbacks'] == 1
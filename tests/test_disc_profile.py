@@ -0,0 +1,83 @@
+import pytest
+
+import main
+from conftest import examples
+
+DISC_EXAMPLES = examples('## 🎭 DISC Profile Examples', '## 🎯')
+
+
+@pytest.mark.parametrize('text', DISC_EXAMPLES)
+def test_every_disc_example_parses(text):
+    profile = main.parse_disc_profile(text)
+    assert profile.complete, (profile, profile.unparsed)
+
+
+def test_examples_were_found():
+    assert len(DISC_EXAMPLES) >= 14
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('High C, low I', 'Low I, High C'),
+    ('C: High, D: Medium, I: Low, S: Low', 'Medium D, Low I, Low S, High C'),
+    ('Conscientiousness: High, Influence: Low, Steadiness: Medium, Dominance: Low',
+     'Low D, Low I, Medium S, High C'),
+    ('Balanced D, High I, Medium C, Low S', 'Medium D, High I, Low S, Medium C'),
+    ('D: 15, I: 8, S: 12, C: 20', 'High D, Low I, Medium S, High C'),
+    ('Dominance: 15, Influence: 8, Steadiness: 12, Conscientiousness: 20', 'High D, Low I, Medium S, High C'),
+    ('DISC Score: D15-I8-S12-C20', 'High D, Low I, Medium S, High C'),
+    ('High D (15), Low I (8), Medium S (12), High C (20)', 'High D, Low I, Medium S, High C'),
+])
+def test_disc_formats_share_a_canonical_form(text, expected):
+    assert main.parse_disc_profile(text).canonical == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('very high C, low I', 'Low I, High C'),
+    ('Very Low S', 'Low S'),
+    ('extremely strong D', 'High D'),
+])
+def test_disc_intensifiers_do_not_change_the_level(text, expected):
+    profile = main.parse_disc_profile(text)
+    assert profile.complete
+    assert profile.canonical == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('high-C, low-I', 'Low I, High C'),
+    ('C-high', 'High C'),
+    ('very-high D', 'High D'),
+])
+def test_disc_hyphen_joins_a_pair(text, expected):
+    profile = main.parse_disc_profile(text)
+    assert profile.complete
+    assert profile.canonical == expected
+
+
+def test_disc_word_level_wins_over_score():
+    assert main.parse_disc_profile('Low D (25)')['D'] == 1
+
+
+@pytest.mark.parametrize('text', ['', 'bananas', 'High', 'D'])
+def test_disc_unparseable_input_is_not_complete(text):
+    assert not main.parse_disc_profile(text).complete
+
+
+def test_disc_profiles_compare_by_value():
+    assert main.parse_disc_profile('High C, low I') == main.parse_disc_profile('I: Low, C: High')
+    assert main.parse_disc_profile('High C').distance(main.parse_disc_profile('Low C, High D')) == 2
+
+
+def test_cache_key_ignores_spelling():
+    assert (main.report_cache_key('Sun in Libra, Ascendant in Capricorn', 'High C, low I')
+            == main.report_cache_key('Libra Sun, Capricorn Rising', 'C: High, I: Low'))
+
+
+@pytest.mark.parametrize('body', [
+    {'birth': 'Sun in Leo', 'disc': 'bananas'},
+    {'birth': 'Sun in Leo', 'disc': ['High C']},
+    {'birth': 42, 'disc': 'High C'},
+])
+def test_generate_rejects_unusable_profiles_as_json(body):
+    response = main.app.test_client().post('/generate', json=body)
+    assert response.status_code == 400
+    assert response.is_json and 'error' in response.get_json()
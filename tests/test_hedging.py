@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+import main
+from conftest import PARAGRAPH, FakeModel, breaker_for
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    """Returns use(percent, holdout): installs a fresh HedgePolicy that hedges after one sample."""
+    def use(percent=100, holdout=0):
+        policy = main.HedgePolicy(percent, 1, holdout)
+        monkeypatch.setattr(main, 'HEDGING', policy)
+        return policy
+    return use
+
+
+def _models(gemini, primary_delay, hedge_delay):
+    """A primary whose p90 is 10ms and a second model to hedge to."""
+    primary, hedge = gemini(FakeModel('gemini-a', delay=primary_delay), FakeModel('gemini-b', delay=hedge_delay))
+    breaker_for(primary).record_success(0.01)
+    return primary, hedge
+
+
+def _half_open(model):
+    breaker = breaker_for(model)
+    breaker.state, breaker.opened_at = 'open', main.time.monotonic() - main.GEMINI_BREAKER_COOLDOWN - 1
+    return breaker
+
+
+# =====================
+# Percentiles
+# =====================
+@pytest.mark.parametrize('q, expected', [
+    (0.01, 1), (0.5, 50), (0.9, 90), (0.99, 99), (1.0, 100),
+])
+def test_percentile_is_nearest_rank(q, expected):
+    assert main._percentile(range(100, 0, -1), q) == expected
+
+
+def test_percentile_of_small_samples():
+    assert main._percentile([5], 0.99) == 5
+    assert main._percentile([1, 2], 0.5) == 1
+    assert main._percentile([1, 2, 3, 4], 0.9) == 4
+
+
+# =====================
+# Hedged calls
+# =====================
+def test_no_hedge_without_latency_samples(gemini, hedging):
+    policy = hedging()
+    primary, hedge = gemini(FakeModel('gemini-a', delay=0.02), FakeModel('gemini-b'))
+    assert main.request_gemini_paragraph('Sun in Leo', 'High D') == PARAGRAPH
+    assert hedge.calls == 0
+    assert policy.stats()['requests'] == 1
+
+
+def test_hedge_wins_over_a_slow_primary_without_taking_over(gemini, hedging):
+    policy = hedging()
+    primary, hedge = _models(gemini, primary_delay=0.1, hedge_delay=0)
+    assert main.request_gemini_paragraph('Sun in Leo', 'High D') == PARAGRAPH
+    stats = policy.stats()
+    assert (stats['hedged'], stats['hedge_wins']) == (1, 1)
+    assert main.GEMINI_MODEL is primary  # hedges never promote their model
+    primary.wait_closed()
+    assert hedge.calls == 1
+
+
+def test_hedge_budget_is_enforced(gemini, hedging):
+    policy = hedging(percent=50)
+    primary, hedge = _models(gemini, primary_delay=0.02, hedge_delay=0)
+    assert main.request_gemini_paragraph('Sun in Leo', 'High D') == PARAGRAPH
+    assert hedge.calls == 0
+    assert policy.stats()['budget_denied'] == 1
+
+
+def test_held_out_requests_are_never_hedged(gemini, hedging):
+    policy = hedging(holdout=100)
+    primary, hedge = _models(gemini, primary_delay=0.02, hedge_delay=0)
+    assert main.request_gemini_paragraph('Sun in Leo', 'High D') == PARAGRAPH
+    assert hedge.calls == 0
+    stats = policy.stats()
+    assert stats['hedged'] == 0 and stats['p99_holdout_ms'] is not None
+
+
+def test_losing_half_open_hedge_hands_back_its_trial(gemini, hedging):
+    hedging()
+    primary, hedge = _models(gemini, primary_delay=0.02, hedge_delay=0.2)
+    breaker = _half_open(hedge)
+    assert main.request_gemini_paragraph('Sun in Leo', 'High D') == PARAGRAPH
+    hedge.wait_closed()
+    assert breaker.state == 'half_open'
+    assert breaker.allow()  # the next request may try the model again
+
+
+def test_losing_half_open_primary_hands_back_its_trial(gemini, hedging):
+    hedging()
+    primary, hedge = _models(gemini, primary_delay=0.2, hedge_delay=0)
+    breaker = _half_open(primary)
+    assert main.request_gemini_paragraph('Sun in Leo', 'High D') == PARAGRAPH
+    primary.wait_closed()
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
+
+
+def test_async_hedge_wins_over_a_slow_primary(gemini, hedging):
+    policy = hedging()
+    primary, hedge = _models(gemini, primary_delay=0.1, hedge_delay=0)
+    assert asyncio.run(main.request_gemini_paragraph_async('Sun in Leo', 'High D')) == PARAGRAPH
+    assert policy.stats()['hedge_wins'] == 1
+    assert primary.closed == primary.calls == 1
+
+
+def test_async_losing_half_open_hedge_hands_back_its_trial(gemini, hedging):
+    hedging()
+    primary, hedge = _models(gemini, primary_delay=0.02, hedge_delay=0.2)
+    breaker = _half_open(hedge)
+    assert asyncio.run(main.request_gemini_paragraph_async('Sun in Leo', 'High D')) == PARAGRAPH
+    assert hedge.closed == hedge.calls == 1
+    assert breaker.state == 'half_open'
+    assert breaker.allow()
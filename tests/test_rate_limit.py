@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+import main
+from conftest import FakeModel, breaker_for
+
+
+@pytest.fixture
+def sleeps(monkeypatch, clock):
+    """Sleeping advances the fake clock instead of waiting; returns the list of sleeps."""
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        clock.advance(seconds)
+    monkeypatch.setattr(main.time, 'sleep', sleep)
+    return slept
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = main.TokenBucket(60)
+    bucket.level = 0
+    clock.advance(10)
+    bucket.refill(clock())
+    assert bucket.level == 10
+    assert bucket.wait_for(15) == 5
+    clock.advance(600)
+    bucket.refill(clock())
+    assert bucket.level == 60
+    assert bucket.wait_for(1) == 0
+
+
+def test_calls_within_budget_do_not_wait(sleeps):
+    limiter = main.RateLimiter(rpm=3, tpm=0, max_wait=10, max_queue=5)
+    assert all(limiter.acquire(100) for _ in range(3))
+    assert sleeps == []
+    assert limiter.stats()['admitted'] == 3
+
+
+def test_call_over_budget_sleeps_for_its_turn(sleeps):
+    limiter = main.RateLimiter(rpm=60, tpm=600, max_wait=60, max_queue=5)
+    assert limiter.acquire(600)
+    assert limiter.acquire(300)
+    assert sleeps == [30]
+    stats = limiter.stats()
+    assert (stats['queued'], stats['waiting']) == (1, 0)
+
+
+def test_call_over_max_wait_is_rejected(sleeps):
+    limiter = main.RateLimiter(rpm=1, tpm=0, max_wait=10, max_queue=5)
+    assert limiter.acquire(1)
+    assert not limiter.acquire(1)
+    assert sleeps == []
+    assert limiter.stats()['rejected'] == 1
+
+
+def test_full_queue_rejects_but_patient_callers_still_wait(clock):
+    limiter = main.RateLimiter(rpm=60, tpm=0, max_wait=10, max_queue=1)
+    assert limiter._reserve(1, None) == 0
+    for _ in range(59):
+        limiter._reserve(1, None)
+    assert limiter._reserve(1, None) == pytest.approx(1)  # queued, still sleeping
+    assert limiter._reserve(1, None) is None  # queue full
+    # An explicit max_wait (offline jobs) skips the queue limit but not the wait limit
+    assert limiter._reserve(1, 10) == pytest.approx(2)
+    assert limiter._reserve(1, 1) is None
+
+
+def test_async_acquire_waits_without_blocking(monkeypatch, clock):
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+        clock.advance(seconds)
+    monkeypatch.setattr(main.asyncio, 'sleep', sleep)
+    limiter = main.RateLimiter(rpm=60, tpm=0, max_wait=10, max_queue=5)
+    limiter.buckets['requests'].level = 0
+    assert asyncio.run(limiter.acquire_async(1))
+    assert slept == [1]
+    assert limiter.waiting == 0
+
+
+def test_exhausted_budget_falls_back_and_releases_a_half_open_trial(gemini, monkeypatch):
+    model, = gemini(FakeModel())
+    breaker = breaker_for(model)
+    breaker.state, breaker.opened_at = 'open', main.time.monotonic() - main.GEMINI_BREAKER_COOLDOWN - 1
+    monkeypatch.setattr(main, 'RATE_LIMITER', main.RateLimiter(rpm=1, tpm=0, max_wait=0, max_queue=0))
+    main.RATE_LIMITER.acquire(1)
+
+    assert main.generate_career_paragraph('Sun in Leo', 'High D')[1] == 'Fallback Generator'
+    assert model.calls == 0
+    assert breaker.state == 'half_open'
+    assert breaker.allow()  # the trial was handed back, not lost
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Returns open_store(ttl=0) on a fresh database; every store is closed afterwards."""
+    monkeypatch.setattr(main, 'REPORT_STORE_FLUSH_SECONDS', 10)
+    path = str(tmp_path / 'reports.sqlite3')
+    opened = []
+
+    def open_store(ttl=0):
+        opened.append(main.ReportStore(path, ttl))
+        return opened[-1]
+    yield open_store
+    for each in opened:
+        each.close()
+
+
+def test_queued_reports_are_written_on_close(store):
+    reports = store()
+    reports.put('k', 'Sun in Leo', 'High D', 'paragraph')
+    reports.close()
+    paragraph, age = reports.get('k')
+    assert paragraph == 'paragraph'
+    assert 0 <= age < 5
+    # Another process (here: another store) sees the same rows
+    assert store().get('k')[0] == 'paragraph'
+
+
+def test_writes_are_committed_in_batches(store, monkeypatch):
+    monkeypatch.setattr(main, 'REPORT_STORE_BATCH', 2)
+    reports = store()
+    for i in range(5):
+        reports.put(f'k{i}', 'Sun in Leo', 'High D', f'paragraph {i}')
+    reports.close()
+    stats = reports.stats()
+    assert (stats['written'], stats['commits'], stats['pending_writes']) == (5, 3, 0)
+    assert reports.get('k4')[0] == 'paragraph 4'
+
+
+def test_reports_expire_after_ttl(store):
+    reports = store(ttl=0.05)
+    reports.put('k', 'Sun in Leo', 'High D', 'paragraph')
+    reports.close()
+    assert reports.get('k') is not None
+    time.sleep(0.1)
+    assert reports.get('k') is None
+    assert reports.stats()['misses'] == 1
+
+
+def test_reports_are_kept_per_prompt_version(store, monkeypatch):
+    reports = store()
+    reports.put('k', 'Sun in Leo', 'High D', 'paragraph')
+    reports.close()
+    monkeypatch.setattr(main, 'PROMPT_VERSION', 'something else')
+    assert reports.get('k') is None
+
+
+def test_disabled_store_ignores_everything():
+    reports = main.ReportStore('', 0)
+    reports.put('k', 'Sun in Leo', 'High D', 'paragraph')
+    assert reports.get('k') is None
+    assert not reports.stats()['enabled']
+
+
+def test_store_hit_is_served_and_copied_into_the_cache(store, monkeypatch):
+    reports = store()
+    key = main.report_cache_key('Sun in Leo', 'High D')
+    reports.put(key, 'Sun in Leo', 'High D', 'stored paragraph')
+    reports.close()
+    monkeypatch.setattr(main, 'REPORT_STORE', reports)
+
+    assert main.generate_career_paragraph('Sun in Leo', 'High D') == ('stored paragraph', 'store')
+    assert main.generate_career_paragraph('Leo Sun', 'D: high') == ('stored paragraph', 'cache')
+    assert reports.stats()['hits'] == 1
@@ -0,0 +1,123 @@
+import time
+
+import pytest
+
+import main
+from conftest import PARAGRAPH, FakeModel
+
+
+def test_cache_entry_expires_at_hard_ttl(clock):
+    cache = main.ResponseCache(max_entries=10, ttl=100)
+    cache.set('k', 'v')
+    clock.advance(99)
+    assert cache.get('k') == 'v'
+    clock.advance(1)
+    assert cache.get('k') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_cache_set_resets_the_ttl(clock):
+    cache = main.ResponseCache(max_entries=10, ttl=100)
+    cache.set('k', 'old')
+    clock.advance(50)
+    cache.set('k', 'new')
+    clock.advance(99)
+    assert cache.get('k') == 'new'
+
+
+def test_cache_evicts_least_recently_used(clock):
+    cache = main.ResponseCache(max_entries=2, ttl=100)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_cache_disabled_by_zero_size_or_ttl():
+    for cache in (main.ResponseCache(max_entries=0, ttl=100), main.ResponseCache(max_entries=10, ttl=0)):
+        cache.set('k', 'v')
+        assert cache.get('k') is None
+
+
+def test_cache_counts_hits_and_misses():
+    cache = main.ResponseCache(max_entries=10, ttl=100)
+    cache.get('k')
+    cache.set('k', 'v')
+    cache.get('k')
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+
+def test_cache_entry_is_fresh_before_soft_ttl(clock):
+    cache = main.ResponseCache(max_entries=10, ttl=100, soft_ttl=10)
+    cache.set('k', 'v')
+    clock.advance(9)
+    assert cache.lookup('k') == ('v', False)
+    assert not cache.claim_refresh('k', retry_after=5)
+
+
+def test_cache_entry_is_stale_between_soft_and_hard_ttl(clock):
+    cache = main.ResponseCache(max_entries=10, ttl=100, soft_ttl=10)
+    cache.set('k', 'v')
+    clock.advance(10)
+    assert cache.lookup('k') == ('v', True)
+    # Only the first reader refreshes, until retry_after has passed
+    assert cache.claim_refresh('k', retry_after=5)
+    assert not cache.claim_refresh('k', retry_after=5)
+    clock.advance(5)
+    assert cache.claim_refresh('k', retry_after=5)
+    assert cache.stats()['stale_hits'] == 1
+
+
+def test_cache_set_resets_both_ttls(clock):
+    cache = main.ResponseCache(max_entries=10, ttl=100, soft_ttl=10)
+    cache.set('k', 'old')
+    clock.advance(50)
+    cache.set('k', 'new')
+    assert cache.lookup('k') == ('new', False)
+
+
+def test_cache_stale_set_is_due_a_refresh_at_once(clock):
+    cache = main.ResponseCache(max_entries=10, ttl=100, soft_ttl=10)
+    cache.set('k', 'v', stale=True)
+    assert cache.lookup('k') == ('v', True)
+
+
+@pytest.mark.parametrize('soft_ttl', [0, 100, 200])
+def test_cache_without_valid_soft_ttl_never_serves_stale(clock, soft_ttl):
+    cache = main.ResponseCache(max_entries=10, ttl=100, soft_ttl=soft_ttl)
+    cache.set('k', 'v')
+    clock.advance(99)
+    assert cache.lookup('k') == ('v', False)
+
+
+def test_gemini_paragraph_is_served_from_cache(gemini):
+    model, = gemini(FakeModel())
+    assert main.generate_career_paragraph('Sun in Leo', 'High D') == (PARAGRAPH, 'Gemini API')
+    # Different spelling, same normalized key
+    assert main.generate_career_paragraph('leo sun', 'D: high') == (PARAGRAPH, 'cache')
+    assert model.calls == 1
+
+
+def test_fallback_paragraph_is_not_cached():
+    paragraph, source = main.generate_career_paragraph('Sun in Leo', 'High D')
+    assert source == 'Fallback Generator'
+    assert main.RESPONSE_CACHE.get(main.report_cache_key('Sun in Leo', 'High D')) is None
+
+
+def test_stale_report_is_served_while_it_is_refreshed(gemini):
+    model, = gemini(FakeModel(delay=0.02))
+    key = main.report_cache_key('Sun in Leo', 'High D')
+    main.RESPONSE_CACHE.set(key, 'old', stale=True)
+    assert main.generate_career_paragraph('Sun in Leo', 'High D') == ('old', 'cache')
+    # A second reader gets the stale copy too, without starting another refresh
+    assert main.generate_career_paragraph('Sun in Leo', 'High D') == ('old', 'cache')
+
+    give_up_at = time.monotonic() + 5
+    while main.RESPONSE_CACHE.lookup(key) != (PARAGRAPH, False):
+        assert time.monotonic() < give_up_at, 'stale entry was never refreshed'
+        time.sleep(0.01)
+    assert model.calls == 1
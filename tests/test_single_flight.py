@@ -0,0 +1,92 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+import main
+from conftest import PARAGRAPH, FakeModel
+
+
+def _concurrently(fn, count):
+    results = [None] * count
+
+    def run(index):
+        results[index] = fn()
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_identical_requests_share_one_upstream_call(gemini):
+    model, = gemini(FakeModel(delay=0.02))
+    results = _concurrently(lambda: main.generate_career_paragraph('Sun in Leo', 'High D'), 8)
+    assert model.calls == 1
+    assert set(results) <= {(PARAGRAPH, 'Gemini API'), (PARAGRAPH, 'cache')}
+    stats = main.SINGLE_FLIGHT.stats()
+    assert stats['leaders'] == 1
+    assert stats['coalesced'] + [source for _, source in results].count('cache') == 7
+    assert stats['in_flight'] == 0
+
+
+def test_different_inputs_are_not_coalesced(gemini):
+    model, = gemini(FakeModel(delay=0.02))
+    discs = ['High D', 'High I', 'High S', 'High C']
+    threads = [threading.Thread(target=main.generate_career_paragraph, args=('Sun in Leo', disc))
+               for disc in discs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert model.calls == 4
+
+
+def test_failed_leader_sends_every_caller_to_the_fallback(gemini):
+    model, = gemini(FakeModel(delay=0.1, error='500 internal'))
+    results = _concurrently(lambda: main.generate_career_paragraph('Sun in Leo', 'High D'), 4)
+    assert {source for _, source in results} == {'Fallback Generator'}
+    assert model.calls == 1
+
+
+def test_callers_give_up_after_the_shared_timeout(gemini, monkeypatch):
+    monkeypatch.setattr(main, 'SINGLE_FLIGHT', main.SingleFlight(0.05))
+    model, = gemini(FakeModel(delay=0.1))
+    paragraph, source = main.generate_career_paragraph('Sun in Leo', 'High D')
+    assert source == 'Fallback Generator'
+    assert main.SINGLE_FLIGHT.stats()['timeouts'] == 1
+    # The call itself was not abandoned: it finishes and fills the cache
+    model.wait_closed(1)
+    deadline = time.monotonic() + 2
+    while main.RESPONSE_CACHE.get(main.report_cache_key('Sun in Leo', 'High D')) is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_leader_exception_reaches_every_waiter():
+    flight = main.SingleFlight(5)
+    release = threading.Event()
+
+    def boom():
+        release.wait(1)
+        raise ValueError('boom')
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        first, started_at = flight.start('k', boom, executor)
+        second, _ = flight.start('k', boom, executor)
+        assert first is second
+        release.set()
+        with pytest.raises(ValueError):
+            flight.wait(first, started_at)
+    assert flight.stats() == {'in_flight': 0, 'leaders': 1, 'coalesced': 1, 'timeouts': 0}
+
+
+def test_wait_honours_a_tighter_deadline():
+    flight = main.SingleFlight(5)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future, started_at = flight.start('k', lambda: time.sleep(0.2), executor)
+        with pytest.raises(FutureTimeoutError):
+            flight.wait(future, started_at, deadline=time.monotonic() + 0.02)
@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+
+import main
+from conftest import PARAGRAPH, FakeModel
+
+
+def _collect(birth, disc, results):
+    results.append(list(main.stream_career_paragraph(birth, disc)))
+
+
+def _sse_events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_identical_streams_share_one_upstream_call(gemini):
+    model, = gemini(FakeModel(delay=0.05))
+    results = []
+    threads = [threading.Thread(target=_collect, args=('Sun in Leo', 'High D', results)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert model.calls == 1
+    assert len(results) == 8
+    for events in results:
+        assert events[-1][1]['paragraph'] == PARAGRAPH
+        assert ''.join(value['text'] for event, value in events if event == 'chunk') == PARAGRAPH
+
+
+def test_generate_joins_an_in_flight_stream(gemini):
+    model, = gemini(FakeModel(delay=0.05))
+    results = []
+    streaming = threading.Thread(target=_collect, args=('Sun in Leo', 'High I', results))
+    streaming.start()
+    time.sleep(0.02)
+    paragraph, source = main.generate_career_paragraph('Leo Sun', 'I: High')
+    streaming.join()
+
+    assert model.calls == 1
+    assert (paragraph, source) == (PARAGRAPH, 'Gemini API')
+    assert results[0][-1] == ('done', {'paragraph': PARAGRAPH, 'source': 'Gemini API'})
+
+
+def test_stream_joins_an_in_flight_generate(gemini):
+    model, = gemini(FakeModel(delay=0.05))
+    caller = threading.Thread(target=main.generate_career_paragraph, args=('Sun in Leo', 'High C'))
+    caller.start()
+    time.sleep(0.02)
+    events = list(main.stream_career_paragraph('Sun in Leo', 'High C'))
+    caller.join()
+
+    assert model.calls == 1
+    # Nothing to replay from a non-streaming call: the paragraph arrives as one chunk
+    assert events == [('chunk', {'text': PARAGRAPH}), ('done', {'paragraph': PARAGRAPH, 'source': 'Gemini API'})]
+
+
+def test_stream_is_served_from_cache_afterwards(gemini):
+    model, = gemini(FakeModel())
+    list(main.stream_career_paragraph('Sun in Leo', 'High S'))
+    second = list(main.stream_career_paragraph('Sun in Leo', 'High S'))
+    assert model.calls == 1
+    assert second == [('chunk', {'text': PARAGRAPH}), ('done', {'paragraph': PARAGRAPH, 'source': 'cache'})]
+
+
+def test_stream_uses_fallback_without_a_model():
+    events = list(main.stream_career_paragraph('Sun in Leo', 'High C'))
+    assert events[-1][1]['source'] == 'Fallback Generator'
+    assert events[0] == ('chunk', {'text': events[-1][1]['paragraph']})
+
+
+def test_stream_route_sends_server_sent_events(gemini):
+    gemini(FakeModel())
+    response = main.app.test_client().post('/generate/stream', json={'birth': 'Sun in Leo', 'disc': 'High D'})
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    events = _sse_events(response.get_data(as_text=True))
+    assert [event for event, _ in events] == ['chunk'] * 4 + ['done']
+    assert events[-1][1] == {'paragraph': PARAGRAPH, 'source': 'Gemini API'}
+
+
+def test_stream_route_accepts_query_parameters():
+    response = main.app.test_client().get('/generate/stream', query_string={'birth': 'Sun in Leo', 'disc': 'High D'})
+    events = _sse_events(response.get_data(as_text=True))
+    assert events[-1][1]['source'] == 'Fallback Generator'
+
+
+def test_stream_route_rejects_unreadable_disc():
+    response = main.app.test_client().get('/generate/stream', query_string={'disc': 'bananas'})
+    assert response.status_code == 400